@@ -0,0 +1,480 @@
+"""
+Almacén persistente de issues e hitos (SQLite)
+Es la fuente de verdad para las claves, las fechas de hitos (with RSOC, with Local Security,
+Closed, First response) y las diferencias en horas. Libro1.xlsx / Libro1.csv se generan
+como vista de exportación desde este almacén.
+"""
+import os
+import csv
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Iterable, Callable
+
+# Columnas de fechas (hitos) y de diferencias en horas que se guardan por issue
+COLUMNAS_HITOS = ['with RSOC', 'with Local Security', 'Closed', 'First response']
+# Las columnas hábiles usan el calendario laboral del equipo (ver calendario_sla.py)
+COLUMNAS_DIFERENCIAS_HABILES = ['I.First Response (hábiles)', 'I.Escalamiento (hábiles)', 'I.respuesta Sub (hábiles)']
+COLUMNAS_DIFERENCIAS = ['I.First Response', 'I.Escalamiento', 'I.respuesta Sub'] + COLUMNAS_DIFERENCIAS_HABILES
+
+RUTA_ALMACEN_DEFAULT = 'jira_hitos.db'
+
+# Partición para issues sin fecha de creación (nunca se sella)
+PARTICION_SIN_FECHA = 'sin-fecha'
+
+# Formatos de fecha que entrega Jira (ej: 2025-12-30T19:15:15.375-0500)
+_FORMATOS_FECHA = [
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+]
+
+
+def obtener_ruta_almacen() -> str:
+    """Ruta del archivo SQLite: config.py (ALMACEN_DB), variable de entorno o valor por defecto"""
+    ruta = None
+    try:
+        import config
+        ruta = getattr(config, 'ALMACEN_DB', None)
+    except ImportError:
+        pass
+    return ruta or os.getenv('ALMACEN_DB') or RUTA_ALMACEN_DEFAULT
+
+
+def fecha_a_epoch(fecha) -> Optional[float]:
+    """
+    Convierte una fecha de Jira a segundos epoch (UTC) respetando el offset.
+    Las fechas sin zona horaria se interpretan como UTC.
+    """
+    if not fecha:
+        return None
+    if isinstance(fecha, datetime):
+        dt = fecha
+    else:
+        texto = str(fecha).strip()
+        if not texto:
+            return None
+        dt = None
+        for formato in _FORMATOS_FECHA:
+            try:
+                dt = datetime.strptime(texto, formato)
+                break
+            except ValueError:
+                continue
+        if dt is None:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def fecha_a_iso_utc(fecha) -> Optional[str]:
+    """Normaliza una fecha de Jira a ISO 8601 en UTC (ordenable como texto)"""
+    epoch = fecha_a_epoch(fecha)
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat(timespec='seconds')
+
+
+def particion_de(creado: Optional[str]) -> str:
+    """Partición temporal de un issue: semana ISO de creación en UTC (ej: '2026-W03')"""
+    epoch = fecha_a_epoch(creado)
+    if epoch is None:
+        return PARTICION_SIN_FECHA
+    anio, semana, _ = datetime.fromtimestamp(epoch, timezone.utc).isocalendar()
+    return f"{anio}-W{semana:02d}"
+
+
+def fin_de_particion(nombre: str) -> Optional[float]:
+    """Epoch (UTC) en que termina la semana ISO de una partición; None para la partición sin fecha"""
+    if nombre == PARTICION_SIN_FECHA:
+        return None
+    anio, semana = nombre.split('-W')
+    inicio = datetime.fromisocalendar(int(anio), int(semana), 1).replace(tzinfo=timezone.utc)
+    return (inicio + timedelta(days=7)).timestamp()
+
+
+class AlmacenIssues:
+    """
+    Almacén embebido con tablas indexadas:
+    - issues: una fila por clave (creación, actualización, estado, vistas)
+    - hitos: fecha de cada hito por issue (fecha original de Jira + epoch)
+    - diferencias: diferencias en horas por issue
+    """
+
+    def __init__(self, ruta: Optional[str] = None):
+        self.ruta = ruta or obtener_ruta_almacen()
+        # Varios trabajadores escriben el mismo archivo: esperar el bloqueo como cola_trabajo
+        self.conn = sqlite3.connect(self.ruta, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA busy_timeout=30000')
+        self._crear_esquema()
+
+    def _crear_esquema(self):
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS issues (
+                    clave TEXT PRIMARY KEY,
+                    creado TEXT,
+                    actualizado TEXT,
+                    estado TEXT,
+                    primera_vez TEXT NOT NULL,
+                    ultima_vez TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_issues_creado ON issues(creado);
+
+                CREATE TABLE IF NOT EXISTS hitos (
+                    clave TEXT NOT NULL,
+                    columna TEXT NOT NULL,
+                    fecha TEXT NOT NULL,
+                    epoch REAL,
+                    PRIMARY KEY (clave, columna)
+                );
+                CREATE INDEX IF NOT EXISTS idx_hitos_columna_epoch ON hitos(columna, epoch);
+
+                CREATE TABLE IF NOT EXISTS diferencias (
+                    clave TEXT NOT NULL,
+                    columna TEXT NOT NULL,
+                    horas REAL NOT NULL,
+                    PRIMARY KEY (clave, columna)
+                );
+                CREATE INDEX IF NOT EXISTS idx_diferencias_columna ON diferencias(columna, horas);
+
+                CREATE TABLE IF NOT EXISTS particiones (
+                    nombre TEXT PRIMARY KEY,
+                    sellada_en TEXT NOT NULL
+                );
+            """)
+
+    def cerrar(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+    def upsert_issues(self, registros: Iterable[Dict]) -> int:
+        """
+        Inserta o actualiza issues. Cada registro debe tener 'Clave' y opcionalmente
+        'creado', 'actualizado' y 'estado' (los valores vacíos no sobrescriben los existentes).
+
+        Returns:
+            Número de registros procesados
+        """
+        ahora = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        filas = []
+        for registro in registros:
+            clave = (registro.get('Clave') or '').strip()
+            if not clave:
+                continue
+            filas.append((clave, fecha_a_iso_utc(registro.get('creado')),
+                          fecha_a_iso_utc(registro.get('actualizado')),
+                          registro.get('estado') or None, ahora, ahora))
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO issues (clave, creado, actualizado, estado, primera_vez, ultima_vez)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(clave) DO UPDATE SET
+                    creado = COALESCE(excluded.creado, issues.creado),
+                    actualizado = COALESCE(excluded.actualizado, issues.actualizado),
+                    estado = COALESCE(excluded.estado, issues.estado),
+                    ultima_vez = excluded.ultima_vez
+            """, filas)
+        return len(filas)
+
+    def guardar_filas(self, issues: Iterable[Dict],
+                      columnas_hitos: Optional[List[str]] = None,
+                      columnas_diferencias: Optional[List[str]] = None) -> int:
+        """
+        Guarda las fechas de hitos y las diferencias en horas de cada issue (una transacción).
+        Un valor vacío borra el hito/diferencia almacenado, igual que al reprocesar desde cero.
+
+        Returns:
+            Número de issues guardados
+        """
+        columnas_hitos = columnas_hitos or COLUMNAS_HITOS
+        columnas_diferencias = columnas_diferencias or COLUMNAS_DIFERENCIAS
+        issues = [i for i in issues if (i.get('Clave') or '').strip()]
+        self.upsert_issues(issues)
+
+        hitos_upsert, hitos_borrar = [], []
+        difs_upsert, difs_borrar = [], []
+        for issue_data in issues:
+            clave = issue_data['Clave'].strip()
+            for columna in columnas_hitos:
+                fecha = str(issue_data.get(columna) or '').strip()
+                if fecha:
+                    hitos_upsert.append((clave, columna, fecha, fecha_a_epoch(fecha)))
+                else:
+                    hitos_borrar.append((clave, columna))
+            for columna in columnas_diferencias:
+                valor = str(issue_data.get(columna) or '').strip()
+                try:
+                    difs_upsert.append((clave, columna, float(valor)))
+                except ValueError:
+                    difs_borrar.append((clave, columna))
+
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO hitos (clave, columna, fecha, epoch) VALUES (?, ?, ?, ?)
+                ON CONFLICT(clave, columna) DO UPDATE SET fecha = excluded.fecha, epoch = excluded.epoch
+            """, hitos_upsert)
+            self.conn.executemany("DELETE FROM hitos WHERE clave = ? AND columna = ?", hitos_borrar)
+            self.conn.executemany("""
+                INSERT INTO diferencias (clave, columna, horas) VALUES (?, ?, ?)
+                ON CONFLICT(clave, columna) DO UPDATE SET horas = excluded.horas
+            """, difs_upsert)
+            self.conn.executemany("DELETE FROM diferencias WHERE clave = ? AND columna = ?", difs_borrar)
+        return len(issues)
+
+    def obtener_claves(self, desde: Optional[str] = None) -> List[str]:
+        """Claves almacenadas, de la más reciente a la más antigua (opcionalmente creadas desde una fecha ISO)"""
+        if desde:
+            cursor = self.conn.execute(
+                "SELECT clave FROM issues WHERE creado >= ? ORDER BY creado DESC, clave DESC", (desde,))
+        else:
+            cursor = self.conn.execute("SELECT clave FROM issues ORDER BY creado DESC, clave DESC")
+        return [fila['clave'] for fila in cursor]
+
+    def obtener_metadatos(self, claves: List[str]) -> Dict[str, Dict]:
+        """Estado y fecha de actualización (ISO UTC) conocidos por clave"""
+        metadatos = {}
+        for inicio in range(0, len(claves), 500):
+            lote = claves[inicio:inicio + 500]
+            marcadores = ','.join('?' * len(lote))
+            for fila in self.conn.execute(
+                    f"SELECT clave, estado, actualizado FROM issues WHERE clave IN ({marcadores})", lote):
+                metadatos[fila['clave']] = {'estado': fila['estado'], 'actualizado': fila['actualizado']}
+        return metadatos
+
+    def obtener_particiones(self, solo_abiertas: bool = False) -> Dict[str, List[str]]:
+        """
+        Agrupa las claves por partición (semana ISO de creación), de la más reciente a la más antigua.
+
+        Args:
+            solo_abiertas: Excluir las particiones selladas
+
+        Returns:
+            Diccionario partición -> claves (ordenadas como obtener_claves)
+        """
+        selladas = self.particiones_selladas() if solo_abiertas else set()
+        particiones = {}
+        for fila in self.conn.execute("SELECT clave, creado FROM issues ORDER BY creado DESC, clave DESC"):
+            nombre = particion_de(fila['creado'])
+            if nombre not in selladas:
+                particiones.setdefault(nombre, []).append(fila['clave'])
+        return particiones
+
+    def particiones_selladas(self) -> set:
+        """Nombres de las particiones selladas (no se vuelven a leer, enriquecer ni escribir)"""
+        return {fila['nombre'] for fila in self.conn.execute("SELECT nombre FROM particiones")}
+
+    def particion_completa(self, claves: List[str], columna_cierre: str = 'Closed',
+                           nombre: Optional[str] = None, ventana_horas: Optional[float] = None,
+                           estado_cerrado: Optional[Callable[[str], bool]] = None) -> bool:
+        """
+        Indica si una partición puede sellarse: todos sus issues tienen el hito de cierre
+        y su estado actual (si se conoce) es cerrado.
+
+        Args:
+            estado_cerrado: Decide si un estado es terminal (la regla del hito de cierre configurado);
+                sin él solo se exige la fecha del hito de cierre
+            nombre: Partición (semana ISO) de las claves
+            ventana_horas: Ventana de descubrimiento; una semana que termina dentro de ella
+                todavía puede recibir issues nuevos y no se sella
+        """
+        if not claves:
+            return False
+        if nombre is not None and ventana_horas is not None:
+            fin = fin_de_particion(nombre)
+            limite = datetime.now(timezone.utc).timestamp() - ventana_horas * 3600
+            if fin is None or fin > limite:
+                return False
+        for inicio in range(0, len(claves), 500):
+            lote = claves[inicio:inicio + 500]
+            marcadores = ','.join('?' * len(lote))
+            for fila in self.conn.execute(f"""
+                SELECT i.estado, h.fecha FROM issues i
+                LEFT JOIN hitos h ON h.clave = i.clave AND h.columna = ?
+                WHERE i.clave IN ({marcadores})
+            """, [columna_cierre] + lote):
+                if fila['fecha'] is None:
+                    return False
+                if fila['estado'] and estado_cerrado is not None and not estado_cerrado(fila['estado']):
+                    return False
+        return True
+
+    def sellar_particion(self, nombre: str):
+        """Marca una partición como sellada (la partición sin fecha nunca se sella)"""
+        if nombre == PARTICION_SIN_FECHA:
+            return
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO particiones (nombre, sellada_en) VALUES (?, ?)",
+                              (nombre, datetime.now(timezone.utc).isoformat(timespec='seconds')))
+
+    def obtener_filas(self, claves: Optional[List[str]] = None,
+                      columnas_hitos: Optional[List[str]] = None,
+                      columnas_diferencias: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Reconstruye las filas de la tabla de salida desde el almacén.
+
+        Args:
+            claves: Claves a exportar, en el orden deseado (None para todas)
+
+        Returns:
+            Lista de diccionarios con 'Clave', fechas de hitos y diferencias (formato "%.2f")
+        """
+        columnas_hitos = columnas_hitos or COLUMNAS_HITOS
+        columnas_diferencias = columnas_diferencias or COLUMNAS_DIFERENCIAS
+        if claves is None:
+            claves = self.obtener_claves()
+
+        filas = {}
+        for clave in claves:
+            fila = {'Clave': clave}
+            for columna in columnas_hitos + columnas_diferencias:
+                fila[columna] = ''
+            filas[clave] = fila
+
+        # Consultar por lotes para no exceder el límite de parámetros de SQLite
+        claves_unicas = list(filas)
+        for inicio in range(0, len(claves_unicas), 500):
+            lote = claves_unicas[inicio:inicio + 500]
+            marcadores = ','.join('?' * len(lote))
+            for fila in self.conn.execute(
+                    f"SELECT clave, columna, fecha FROM hitos WHERE clave IN ({marcadores})", lote):
+                if fila['columna'] in columnas_hitos:
+                    filas[fila['clave']][fila['columna']] = fila['fecha']
+            for fila in self.conn.execute(
+                    f"SELECT clave, columna, horas FROM diferencias WHERE clave IN ({marcadores})", lote):
+                if fila['columna'] in columnas_diferencias:
+                    filas[fila['clave']][fila['columna']] = f"{fila['horas']:.2f}"
+
+        return [filas[clave] for clave in claves]
+
+    def exportar_xlsx(self, archivo_salida: str, claves: Optional[List[str]] = None,
+                      columnas_hitos: Optional[List[str]] = None,
+                      hojas_extra: Optional[Dict[str, tuple]] = None) -> int:
+        """
+        Genera el XLSX de salida desde el almacén.
+
+        Args:
+            hojas_extra: Hojas adicionales {nombre: (encabezados, filas)} escritas después de los datos
+
+        Returns:
+            Número de filas de datos escritas
+        """
+        from openpyxl import Workbook
+
+        columnas_hitos = columnas_hitos or COLUMNAS_HITOS
+        fieldnames = ['Clave'] + columnas_hitos + COLUMNAS_DIFERENCIAS
+        filas = self.obtener_filas(claves, columnas_hitos=columnas_hitos)
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(fieldnames)
+        for fila in filas:
+            ws.append([fila.get(col, '') for col in fieldnames])
+        for nombre, (encabezados, filas_hoja) in (hojas_extra or {}).items():
+            ws_extra = wb.create_sheet(title=nombre)
+            ws_extra.append(encabezados)
+            for fila in filas_hoja:
+                ws_extra.append(fila)
+        wb.save(archivo_salida)
+        return len(filas)
+
+    def exportar_columnar(self, archivo_salida: str, claves: Optional[List[str]] = None,
+                          columnas_hitos: Optional[List[str]] = None, formato: str = 'parquet') -> int:
+        """
+        Genera la tabla de salida en formato columnar (Parquet o Arrow IPC) con esquema fijo:
+        'Clave' (string), hitos como timestamp con zona horaria (UTC) y diferencias como float64.
+
+        Args:
+            formato: 'parquet' o 'arrow'
+
+        Returns:
+            Número de filas escritas
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("La exportación Parquet/Arrow requiere pyarrow (pip install pyarrow)")
+
+        columnas_hitos = columnas_hitos or COLUMNAS_HITOS
+        if claves is None:
+            claves = self.obtener_claves()
+
+        # Valores por clave (epoch en ms para hitos, horas para diferencias)
+        valores = {}
+        claves_unicas = list(dict.fromkeys(claves))
+        for inicio in range(0, len(claves_unicas), 500):
+            lote = claves_unicas[inicio:inicio + 500]
+            marcadores = ','.join('?' * len(lote))
+            for fila in self.conn.execute(
+                    f"SELECT clave, columna, epoch FROM hitos WHERE clave IN ({marcadores})", lote):
+                if fila['epoch'] is not None:
+                    valores[(fila['clave'], fila['columna'])] = int(round(fila['epoch'] * 1000))
+            for fila in self.conn.execute(
+                    f"SELECT clave, columna, horas FROM diferencias WHERE clave IN ({marcadores})", lote):
+                valores[(fila['clave'], fila['columna'])] = fila['horas']
+
+        campos = [pa.field('Clave', pa.string(), nullable=False)]
+        campos += [pa.field(col, pa.timestamp('ms', tz='UTC')) for col in columnas_hitos]
+        campos += [pa.field(col, pa.float64()) for col in COLUMNAS_DIFERENCIAS]
+        esquema = pa.schema(campos)
+
+        arreglos = [pa.array(claves, type=pa.string())]
+        for campo in campos[1:]:
+            arreglos.append(pa.array([valores.get((clave, campo.name)) for clave in claves], type=campo.type))
+        tabla = pa.Table.from_arrays(arreglos, schema=esquema)
+
+        if formato == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(tabla, archivo_salida)
+        elif formato == 'arrow':
+            import pyarrow.ipc as ipc
+            with pa.OSFile(archivo_salida, 'wb') as sink:
+                with ipc.new_file(sink, esquema) as writer:
+                    writer.write_table(tabla)
+        else:
+            raise ValueError(f"Formato columnar no soportado: {formato} (usar 'parquet' o 'arrow')")
+        return tabla.num_rows
+
+    def exportar_csv(self, archivo_salida: str, claves: Optional[List[str]] = None,
+                      columnas_hitos: Optional[List[str]] = None) -> int:
+        """Genera el CSV de salida desde el almacén. Returns: número de filas escritas"""
+        columnas_hitos = columnas_hitos or COLUMNAS_HITOS
+        fieldnames = ['Clave'] + columnas_hitos + COLUMNAS_DIFERENCIAS
+        filas = self.obtener_filas(claves, columnas_hitos=columnas_hitos)
+
+        with open(archivo_salida, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(filas)
+        return len(filas)
+
+
+if __name__ == "__main__":
+    # Re-exportar desde el almacén sin consultar Jira
+    # Uso: python almacen.py Libro1.xlsx|Libro1.csv|Libro1.parquet|Libro1.arrow [desde-fecha-ISO]
+    import sys
+
+    archivo = sys.argv[1] if len(sys.argv) > 1 else "Libro1.xlsx"
+    desde = sys.argv[2] if len(sys.argv) > 2 else None
+
+    with AlmacenIssues() as almacen:
+        claves = almacen.obtener_claves(desde)
+        if archivo.lower().endswith('.csv'):
+            total = almacen.exportar_csv(archivo, claves)
+        elif archivo.lower().endswith('.parquet'):
+            total = almacen.exportar_columnar(archivo, claves, formato='parquet')
+        elif archivo.lower().endswith(('.arrow', '.feather')):
+            total = almacen.exportar_columnar(archivo, claves, formato='arrow')
+        else:
+            total = almacen.exportar_xlsx(archivo, claves)
+    print(f"[OK] {total} issues exportados desde {almacen.ruta} a {archivo}")
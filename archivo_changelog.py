@@ -0,0 +1,313 @@
+"""
+Archivo local, solo de anexado y comprimido, de los changelogs crudos descargados de Jira
+Cada descarga de JiraIntegration guarda las 'histories' originales (sin interpretar) para poder
+re-derivar todos los hitos y diferencias sin volver a consultar Jira cuando cambian las reglas
+(HITOS_SLA, FIRST_RESPONSE_ASSIGNEES, coincidencia de estados...).
+
+Archivos (ARCHIVO_CHANGELOG en config.py, por defecto 'changelog_archivo'):
+    <base>.dat  registros zlib (JSON) anexados uno tras otro; se leen con mmap
+    <base>.idx  una línea por registro: clave, offset, longitud, sha1 (la última de cada clave manda)
+    <base>.estados.json  catálogo de estados de Jira (ID -> nombre) de la última conexión
+
+Uso:
+    python archivo_changelog.py                          # resumen del archivo
+    python archivo_changelog.py recalcular [Libro1.xlsx] [--formato xlsx,csv] [--desde 2026-01-01T00:00:00+00:00]
+"""
+import os
+import sys
+import json
+import mmap
+import zlib
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import Optional, List, Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+ARCHIVO_CHANGELOG_DEFAULT = 'changelog_archivo'
+
+
+def obtener_ruta_archivo() -> Optional[str]:
+    """
+    Base de los archivos .dat/.idx: config.py (ARCHIVO_CHANGELOG), variable de entorno o valor
+    por defecto. Un valor vacío en config.py desactiva el archivo.
+    """
+    try:
+        import config
+        if hasattr(config, 'ARCHIVO_CHANGELOG'):
+            return config.ARCHIVO_CHANGELOG or None
+    except ImportError:
+        pass
+    return os.getenv('ARCHIVO_CHANGELOG', ARCHIVO_CHANGELOG_DEFAULT) or None
+
+
+def changelog_desde_historias(issue_key: str, histories: List[Dict]) -> List[Dict]:
+    """
+    Convierte las 'histories' crudas de Jira (API v2 expand=changelog, API v3 /changelog o
+    history.raw de la biblioteca) al formato de JiraIntegration.get_changelog
+    """
+    changelog = []
+    for history in histories:
+        created = history.get('created', '')
+        author = history.get('author', {})
+        author_name = author.get('displayName', '') if author else ''
+        author_id = (author.get('accountId') or author.get('name')) if author else None
+
+        for item in history.get('items', []):
+            changelog.append({
+                'issue_key': issue_key,
+                'date': created,
+                'author': author_name,
+                'author_id': author_id or author_name,
+                'field': item.get('field', ''),
+                'from': item.get('fromString', ''),
+                'to': item.get('toString', ''),
+                'from_id': item.get('from', None),
+                'to_id': item.get('to', None)
+            })
+    return changelog
+
+
+class ArchivoChangelog:
+    """
+    Archivo de changelogs crudos con índice por clave. Los registros nunca se reescriben:
+    una nueva versión del changelog de un issue se anexa y el índice apunta a la última.
+    Si las historias no cambiaron desde la última versión, no se anexa nada.
+    """
+
+    def __init__(self, ruta_base: Optional[str] = None):
+        ruta_base = ruta_base or obtener_ruta_archivo() or ARCHIVO_CHANGELOG_DEFAULT
+        self.ruta_datos = f"{ruta_base}.dat"
+        self.ruta_indice = f"{ruta_base}.idx"
+        self.ruta_estados = f"{ruta_base}.estados.json"
+        self._lock = threading.Lock()
+        self._indice = {}  # clave -> (offset, longitud, sha1)
+        self._leido_indice = 0  # bytes del índice ya cargados
+        self._mapa = None
+        self._archivo_mapa = None
+        self._cargar_indice()
+
+    def _cargar_indice(self):
+        """Carga (o continúa cargando) el índice; ignora entradas que apuntan fuera del archivo de datos"""
+        if not os.path.exists(self.ruta_indice):
+            return
+        tamano_datos = os.path.getsize(self.ruta_datos) if os.path.exists(self.ruta_datos) else 0
+        with open(self.ruta_indice, 'rb') as f:
+            f.seek(self._leido_indice)
+            for linea in f:
+                if not linea.endswith(b'\n'):
+                    break  # línea incompleta (otro proceso escribiendo): se relee después
+                self._leido_indice += len(linea)
+                partes = linea.decode('utf-8').rstrip('\n').split('\t')
+                if len(partes) != 4:
+                    continue
+                clave, offset, longitud, sha1 = partes[0], int(partes[1]), int(partes[2]), partes[3]
+                if offset + longitud <= tamano_datos:
+                    self._indice[clave] = (offset, longitud, sha1)
+
+    def __len__(self):
+        return len(self._indice)
+
+    def __contains__(self, issue_key: str):
+        return issue_key in self._indice
+
+    def claves(self) -> List[str]:
+        with self._lock:
+            self._cargar_indice()
+            return list(self._indice)
+
+    def guardar(self, issue_key: str, histories: List[Dict], fuente: str) -> bool:
+        """
+        Anexa las historias crudas de un issue.
+
+        Args:
+            fuente: Método de descarga ('api2', 'biblioteca', 'api3')
+
+        Returns:
+            True si se anexó un registro nuevo (False si no había cambios)
+        """
+        contenido = json.dumps(histories, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        sha1 = hashlib.sha1(contenido.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._cargar_indice()
+            actual = self._indice.get(issue_key)
+            if actual is not None and actual[2] == sha1:
+                return False
+            registro = json.dumps({'key': issue_key, 'fuente': fuente,
+                                   'descargado': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                                   'histories': histories}, ensure_ascii=False, separators=(',', ':'))
+            comprimido = zlib.compress(registro.encode('utf-8'), 6)
+            with open(self.ruta_datos, 'ab') as datos, open(self.ruta_indice, 'a', encoding='utf-8') as indice:
+                if fcntl is not None:
+                    fcntl.flock(datos.fileno(), fcntl.LOCK_EX)
+                try:
+                    datos.seek(0, os.SEEK_END)
+                    offset = datos.tell()
+                    datos.write(comprimido)
+                    datos.flush()
+                    # El índice se escribe después de los datos: un corte deja a lo sumo datos sin indexar
+                    indice.write(f"{issue_key}\t{offset}\t{len(comprimido)}\t{sha1}\n")
+                    indice.flush()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(datos.fileno(), fcntl.LOCK_UN)
+            self._indice[issue_key] = (offset, len(comprimido), sha1)
+            return True
+
+    def guardar_estados(self, estados: Dict):
+        """Reemplaza el catálogo de estados (ID -> nombre) de forma atómica"""
+        temporal = f"{self.ruta_estados}.{os.getpid()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({str(k): v for k, v in estados.items()}, f, ensure_ascii=False, sort_keys=True)
+        os.replace(temporal, self.ruta_estados)
+
+    def leer_estados(self) -> Dict[int, str]:
+        """Catálogo de estados guardado por JiraIntegration (vacío si no existe)"""
+        if not os.path.exists(self.ruta_estados):
+            return {}
+        with open(self.ruta_estados, 'r', encoding='utf-8') as f:
+            return {int(k): v for k, v in json.load(f).items()}
+
+    def _mapear(self, fin: int):
+        """Mapa en memoria del archivo de datos; se vuelve a mapear si el archivo creció"""
+        if self._mapa is not None and len(self._mapa) >= fin:
+            return self._mapa
+        self._cerrar_mapa()
+        self._archivo_mapa = open(self.ruta_datos, 'rb')
+        self._mapa = mmap.mmap(self._archivo_mapa.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mapa
+
+    def leer(self, issue_key: str) -> Optional[Dict]:
+        """
+        Último registro archivado de un issue (lectura aleatoria vía mmap).
+
+        Returns:
+            {'key', 'fuente', 'descargado', 'histories'} o None si no está archivado
+        """
+        with self._lock:
+            entrada = self._indice.get(issue_key)
+            if entrada is None:
+                self._cargar_indice()
+                entrada = self._indice.get(issue_key)
+                if entrada is None:
+                    return None
+            offset, longitud, _ = entrada
+            mapa = self._mapear(offset + longitud)
+            return json.loads(zlib.decompress(mapa[offset:offset + longitud]))
+
+    def leer_changelog(self, issue_key: str) -> Optional[List[Dict]]:
+        """Changelog archivado en el formato de get_changelog (None si no está archivado)"""
+        registro = self.leer(issue_key)
+        if registro is None:
+            return None
+        return changelog_desde_historias(issue_key, registro['histories'])
+
+    def _cerrar_mapa(self):
+        if self._mapa is not None:
+            self._mapa.close()
+            self._archivo_mapa.close()
+        self._mapa = None
+        self._archivo_mapa = None
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrar_mapa()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+def recalcular(archivo_salida: str = 'Libro1.xlsx', formatos: Optional[List[str]] = None,
+               desde: Optional[str] = None) -> int:
+    """
+    Re-deriva todos los hitos y diferencias desde el archivo (sin Jira), los guarda en el almacén
+    y exporta la salida con el mismo filtrado (PASO 3) y formatos que procesar_csv.
+    Usa la misma ruta que la ejecución en vivo (CatalogoChangelog: eventos ordenados por epoch y
+    coincidencia por IDs con el catálogo de estados guardado), así que reproduce sus resultados.
+
+    Args:
+        archivo_salida: Archivo de salida (cada formato usa el mismo nombre con su extensión)
+        formatos: Formatos de salida; None usa la configuración de procesar_csv
+        desde: Solo issues creados desde esta fecha ISO (UTC) según el almacén
+
+    Returns:
+        Número de issues recalculados
+    """
+    from almacen import AlmacenIssues
+    from hitos import cargar_definiciones_hitos
+    from reporte_sla import COLUMNA_ASIGNADO
+    from calendario_sla import calcular_diferencias_habiles
+    from jira_integration import CatalogoChangelog
+    from procesar_csv import (calcular_diferencias_horas, escalamiento_previo, exportar_resultados,
+                              cargar_formatos_salida, formato_por_extension)
+
+    definiciones = cargar_definiciones_hitos()
+    columnas_hitos = [d['columna'] for d in definiciones]
+    columna_asignado = next((d['columna'] for d in definiciones if d['campo'] == 'assignee'), None)
+    formatos = formatos or cargar_formatos_salida() or [formato_por_extension(archivo_salida)]
+
+    with ArchivoChangelog() as archivo, AlmacenIssues() as almacen:
+        estados = archivo.leer_estados()
+        if not estados:
+            print(f"[!] Sin catálogo de estados en {archivo.ruta_estados}: se usan los nombres del changelog")
+        catalogo = CatalogoChangelog(estados)
+
+        # Orden y alcance del almacén (created DESC); issues archivados que no estén en el almacén, al final
+        claves_almacen = almacen.obtener_claves(desde)
+        archivadas = set(archivo.claves())
+        claves = [c for c in claves_almacen if c in archivadas]
+        if not desde:
+            en_almacen = set(claves_almacen)
+            claves += sorted(c for c in archivadas if c not in en_almacen)
+        sin_archivo = len(claves_almacen) - sum(1 for c in claves_almacen if c in archivadas)
+        print(f"[*] Recalculando {len(claves)} issues desde {archivo.ruta_datos} "
+              f"({sin_archivo} issues del almacén sin changelog archivado se conservan)")
+
+        issues = []
+        for clave in claves:
+            eventos = catalogo.compactar(archivo.leer_changelog(clave))
+            resultados = catalogo.hitos_de_eventos(clave, eventos, definiciones)
+            issue_data = {'Clave': clave, 'estado': catalogo.ultimo_estado(eventos)}
+            for columna in columnas_hitos:
+                resultado = resultados.get(columna)
+                issue_data[columna] = resultado['date'] if resultado else ''
+                if resultado and columna == columna_asignado:
+                    issue_data[COLUMNA_ASIGNADO] = resultado['value']
+            calcular_diferencias_horas(issue_data)
+            issues.append(issue_data)
+        calcular_diferencias_habiles(issues)
+        almacen.guardar_filas(issues, columnas_hitos=columnas_hitos)
+    print(f"[OK] {len(issues)} issues recalculados y guardados en el almacén")
+
+    filtrados = [i for i in issues if not escalamiento_previo(i)]
+    print(f"[*] Filtrado PASO 3: {len(issues) - len(filtrados)} fila(s) eliminada(s)")
+    exportar_resultados(archivo_salida, filtrados, columnas_hitos, formatos)
+    return len(issues)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Archivo de changelogs crudos y recálculo offline de hitos')
+    parser.add_argument('comando', nargs='?', choices=['resumen', 'recalcular'], default='resumen')
+    parser.add_argument('archivo_salida', nargs='?', default='Libro1.xlsx')
+    parser.add_argument('--formato', default=None, help="Formatos de salida separados por coma (xlsx, csv, parquet, arrow)")
+    parser.add_argument('--desde', default=None, help="Solo issues creados desde esta fecha ISO (UTC)")
+    args = parser.parse_args()
+
+    if args.comando == 'recalcular':
+        formatos = [f.strip() for f in args.formato.split(',') if f.strip()] if args.formato else None
+        recalcular(args.archivo_salida, formatos=formatos, desde=args.desde)
+        sys.exit(0)
+
+    with ArchivoChangelog() as archivo:
+        tamano = os.path.getsize(archivo.ruta_datos) if os.path.exists(archivo.ruta_datos) else 0
+        print(f"[*] Archivo: {archivo.ruta_datos} ({tamano / 1024 / 1024:.2f} MB)")
+        print(f"    Issues archivados: {len(archivo)}")
@@ -0,0 +1,316 @@
+"""
+Microbenchmarks de las rutas críticas con datos sintéticos (sin Jira ni red)
+
+Cubre parse_jira_date, calcular_diferencias_horas, el filtro de Escalamiento del PASO 3,
+get_status_change_date / get_assignee_change_date sobre changelogs en memoria (frío: compactar;
+caliente: solo el recorrido) y la lectura/escritura de XLSX y CSV de procesar_csv.
+
+Uso:
+    python benchmarks/microbench.py --guardar-base benchmarks/baseline.json    # registrar línea base
+    python benchmarks/microbench.py --comparar benchmarks/baseline.json        # detectar regresiones
+    python benchmarks/microbench.py --rapido --solo changelog,parse             # subconjunto pequeño
+
+Con --comparar el proceso termina con código 1 si algún caso es más lento que la línea base
+por encima de la tolerancia.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from procesar_csv import parse_jira_date, calcular_diferencias_horas, escalamiento_previo, leer_issues
+from calendario_sla import CalendarioLaboral, calcular_diferencias_habiles
+from jira_integration import JiraIntegration, _Cassette
+from almacen import AlmacenIssues, COLUMNAS_HITOS, COLUMNAS_DIFERENCIAS
+
+TAMANOS = {
+    'completo': {'changelog': [10, 100, 1000, 5000], 'filas': [1000, 10000, 100000, 500000]},
+    'rapido': {'changelog': [10, 500], 'filas': [1000, 10000]},
+}
+GRUPOS = ('parse', 'diferencias', 'filtro', 'changelog', 'libro')
+TOLERANCIA_DEFAULT = 0.20
+# Diferencias menores a este umbral (segundos) se consideran ruido
+RUIDO_MINIMO = 0.001
+
+ESTADOS = [(1, 'Open'), (2, 'In Progress'), (3, 'Pending'), (4, 'with RSOC'),
+           (5, 'with Local Security'), (6, 'Closed')]
+PERSONAS = [f'Analista {i:02d}' for i in range(40)]
+OBJETIVOS_ASIGNACION = PERSONAS[-3:]
+# Cada cuántas llamadas del recorrido caliente se repite el mismo issue (carga ~constante por caso)
+CAMBIOS_POR_CASO = 200000
+
+
+def _fecha_jira(dt: datetime) -> str:
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}-0500"
+
+
+def generar_fechas(rng: random.Random, cantidad: int, base: datetime) -> list:
+    """Pool de fechas en formato Jira (las filas comparten las cadenas, como al leer un libro)"""
+    return [_fecha_jira(base + timedelta(seconds=rng.randrange(0, 90 * 86400))) for _ in range(cantidad)]
+
+
+def generar_filas(rng: random.Random, cantidad: int) -> list:
+    """Filas con la forma de Libro1: hitos (algunos vacíos) y orden realista entre ellos"""
+    base = datetime(2026, 1, 1, 8, 0, tzinfo=timezone(timedelta(hours=-5)))
+    filas = []
+    for i in range(cantidad):
+        rsoc = base + timedelta(seconds=rng.randrange(0, 90 * 86400))
+        first = rsoc + timedelta(seconds=rng.randrange(60, 8 * 3600))
+        # ~10% escalados antes del First response (los elimina el PASO 3)
+        local = first + timedelta(seconds=rng.randrange(-3600, 48 * 3600) if rng.random() < 0.1
+                                  else rng.randrange(60, 48 * 3600))
+        closed = local + timedelta(seconds=rng.randrange(3600, 10 * 86400))
+        fila = {'Clave': f'TPGSOC-{1000000 + i}'}
+        for columna, fecha in zip(COLUMNAS_HITOS, (rsoc, local, closed, first)):
+            fila[columna] = _fecha_jira(fecha) if rng.random() < 0.9 else ''
+        for columna in COLUMNAS_DIFERENCIAS:
+            fila[columna] = ''
+        filas.append(fila)
+    return filas
+
+
+def generar_changelog(rng: random.Random, issue_key: str, cantidad: int) -> list:
+    """
+    Changelog con el formato de JiraIntegration._fetch_changelog. Los hitos buscados aparecen
+    en el último 10% de los cambios para forzar el recorrido casi completo.
+    """
+    base = datetime(2026, 1, 1, 8, 0, tzinfo=timezone(timedelta(hours=-5)))
+    cambios = []
+    limite_hitos = int(cantidad * 0.9)
+    estado_actual = ESTADOS[0]
+    persona_actual = PERSONAS[0]
+    for i in range(cantidad):
+        fecha = _fecha_jira(base + timedelta(minutes=7 * i))
+        autor = rng.choice(PERSONAS)
+        if rng.random() < 0.5:
+            candidatos = ESTADOS if i >= limite_hitos else ESTADOS[:3]
+            nuevo = rng.choice(candidatos)
+            cambios.append({'issue_key': issue_key, 'date': fecha, 'author': autor, 'author_id': autor,
+                            'field': 'status', 'from': estado_actual[1], 'to': nuevo[1],
+                            'from_id': str(estado_actual[0]), 'to_id': str(nuevo[0])})
+            estado_actual = nuevo
+        else:
+            candidatos = PERSONAS if i >= limite_hitos else PERSONAS[:-3]
+            nuevo = rng.choice(candidatos)
+            cambios.append({'issue_key': issue_key, 'date': fecha, 'author': autor, 'author_id': autor,
+                            'field': 'assignee', 'from': persona_actual, 'to': nuevo,
+                            'from_id': persona_actual, 'to_id': nuevo})
+            persona_actual = nuevo
+    return cambios
+
+
+def crear_jira_en_memoria(directorio: str, changelogs: dict) -> JiraIntegration:
+    """
+    JiraIntegration en modo replay con un cassette sintético (tipo de Jira y catálogo de estados);
+    los changelogs se sirven desde memoria en lugar de _fetch_changelog.
+    """
+    cassette = _Cassette(os.path.join(directorio, 'bench_cassette.jsonl.gz'))
+    cassette.grabar_meta('jira_type', 'cloud')
+    catalogo = [{'id': str(id_), 'name': nombre} for id_, nombre in ESTADOS]
+    cassette.grabar('GET', '/rest/api/2/status', None,
+                    SimpleNamespace(status_code=200, text=json.dumps(catalogo)))
+    jira = JiraIntegration(http_mode='replay', cassette_path=cassette.ruta)
+    jira._fetch_changelog = changelogs.__getitem__
+    return jira
+
+
+def medir(funcion, repeticiones: int, preparar=None) -> dict:
+    """Ejecuta la función `repeticiones` veces (preparar() no se mide) y resume los tiempos"""
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar is not None:
+            preparar()
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {'mediana': statistics.median(tiempos), 'minimo': min(tiempos), 'repeticiones': repeticiones}
+
+
+def casos_parse(rng, tamanos, repeticiones):
+    for n in tamanos['filas']:
+        fechas = generar_fechas(rng, n, datetime(2026, 1, 1))
+        yield f'parse_jira_date[n={n}]', medir(lambda: [parse_jira_date(f) for f in fechas], repeticiones)
+
+
+def casos_diferencias(rng, tamanos, repeticiones):
+    calendario = CalendarioLaboral()
+    for n in tamanos['filas']:
+        filas = generar_filas(rng, n)
+        yield f'calcular_diferencias_horas[filas={n}]', medir(
+            lambda: [calcular_diferencias_horas(f) for f in filas], repeticiones)
+        # El índice del calendario se construye en la primera llamada (fuera de la medición)
+        calcular_diferencias_habiles(filas[:1], calendario)
+        yield f'calcular_diferencias_habiles[filas={n}]', medir(
+            lambda: calcular_diferencias_habiles(filas, calendario), repeticiones)
+
+
+def casos_filtro(rng, tamanos, repeticiones):
+    for n in tamanos['filas']:
+        filas = generar_filas(rng, n)
+        yield f'filtro_escalamiento[filas={n}]', medir(
+            lambda: [f for f in filas if not escalamiento_previo(f)], repeticiones)
+
+
+def casos_changelog(rng, tamanos, repeticiones, directorio):
+    changelogs = {f'BENCH-{n}': generar_changelog(rng, f'BENCH-{n}', n) for n in tamanos['changelog']}
+    jira = crear_jira_en_memoria(directorio, changelogs)
+    for n in tamanos['changelog']:
+        clave = f'BENCH-{n}'
+        llamadas = max(1, CAMBIOS_POR_CASO // n)
+
+        def estado():
+            for _ in range(llamadas):
+                jira.get_status_change_date(clave, 'with Local Security')
+
+        def asignacion():
+            for _ in range(llamadas):
+                jira.get_assignee_change_date(clave, OBJETIVOS_ASIGNACION)
+
+        # Frío: descarga simulada + compactación del changelog en cada llamada
+        yield f'changelog_compactar[cambios={n}]', medir(
+            lambda: jira.get_status_change_date(clave, 'with Local Security'), repeticiones,
+            preparar=jira.clear_changelog_cache)
+        # Caliente: eventos ya compactados, solo el recorrido
+        jira.get_changelog_events(clave)
+        yield f'get_status_change_date[cambios={n},llamadas={llamadas}]', medir(estado, repeticiones)
+        yield f'get_assignee_change_date[cambios={n},llamadas={llamadas}]', medir(asignacion, repeticiones)
+
+
+def casos_libro(rng, tamanos, repeticiones, directorio):
+    almacen = AlmacenIssues(os.path.join(directorio, 'bench_almacen.db'))
+    columnas = ['Clave'] + COLUMNAS_HITOS + COLUMNAS_DIFERENCIAS
+    try:
+        for n in tamanos['filas']:
+            filas = generar_filas(rng, n)
+            for f in filas:
+                calcular_diferencias_horas(f)
+            almacen.conn.execute("DELETE FROM hitos")
+            almacen.conn.execute("DELETE FROM diferencias")
+            almacen.guardar_filas(filas)
+            claves = [f['Clave'] for f in filas]
+            archivo_xlsx = os.path.join(directorio, f'bench_{n}.xlsx')
+            archivo_csv = os.path.join(directorio, f'bench_{n}.csv')
+
+            yield f'escribir_xlsx[filas={n}]', medir(lambda: almacen.exportar_xlsx(archivo_xlsx, claves), repeticiones)
+            yield f'escribir_csv[filas={n}]', medir(lambda: almacen.exportar_csv(archivo_csv, claves), repeticiones)
+            yield f'leer_xlsx[filas={n}]', medir(lambda: leer_issues(archivo_xlsx, columnas), repeticiones)
+            yield f'leer_csv[filas={n}]', medir(lambda: leer_issues(archivo_csv, columnas), repeticiones)
+    finally:
+        almacen.cerrar()
+
+
+def ejecutar(grupos, tamanos, repeticiones, semilla) -> dict:
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix='microbench_') as directorio:
+        generadores = {
+            'parse': lambda rng: casos_parse(rng, tamanos, repeticiones),
+            'diferencias': lambda rng: casos_diferencias(rng, tamanos, repeticiones),
+            'filtro': lambda rng: casos_filtro(rng, tamanos, repeticiones),
+            'changelog': lambda rng: casos_changelog(rng, tamanos, repeticiones, directorio),
+            'libro': lambda rng: casos_libro(rng, tamanos, repeticiones, directorio),
+        }
+        for grupo in grupos:
+            # Semilla por grupo: los datos no dependen de qué otros grupos se ejecuten
+            rng = random.Random(f'{semilla}-{grupo}')
+            for nombre, medicion in generadores[grupo](rng):
+                resultados[nombre] = medicion
+                print(f"[OK] {nombre:<60} mediana {medicion['mediana']:.4f}s  mínimo {medicion['minimo']:.4f}s")
+    return resultados
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def comparar(resultados: dict, base: dict, tolerancia: float) -> list:
+    """
+    Compara las medianas contra la línea base e imprime la tabla.
+
+    Returns:
+        Nombres de los casos con regresión
+    """
+    regresiones = []
+    print(f"\n{'Caso':<60} {'Base (s)':>10} {'Actual (s)':>11} {'Cambio':>9}")
+    for nombre, medicion in resultados.items():
+        anterior = base.get(nombre)
+        if anterior is None:
+            print(f"{nombre:<60} {'-':>10} {medicion['mediana']:>11.4f} {'nuevo':>9}")
+            continue
+        cambio = medicion['mediana'] / anterior['mediana'] - 1 if anterior['mediana'] else 0.0
+        marca = ''
+        if cambio > tolerancia and medicion['mediana'] - anterior['mediana'] > RUIDO_MINIMO:
+            regresiones.append(nombre)
+            marca = '  [REGRESIÓN]'
+        print(f"{nombre:<60} {anterior['mediana']:>10.4f} {medicion['mediana']:>11.4f} {cambio:>+8.1%}{marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks de las rutas críticas (datos sintéticos)')
+    parser.add_argument('--rapido', action='store_true', help='Tamaños pequeños (changelog 10/500, filas 1k/10k)')
+    parser.add_argument('--solo', default=None, help=f"Grupos separados por coma: {', '.join(GRUPOS)}")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--semilla', type=int, default=1234)
+    parser.add_argument('--salida', metavar='JSON', help='Guardar los resultados de esta ejecución')
+    parser.add_argument('--guardar-base', metavar='JSON', help='Guardar los resultados como línea base')
+    parser.add_argument('--comparar', metavar='JSON', help='Comparar contra una línea base guardada')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_DEFAULT,
+                        help='Aumento relativo de la mediana tolerado antes de marcar regresión (0.20 = 20%%)')
+    args = parser.parse_args()
+
+    grupos = [g.strip() for g in args.solo.split(',') if g.strip()] if args.solo else list(GRUPOS)
+    invalidos = [g for g in grupos if g not in GRUPOS]
+    if invalidos:
+        parser.error(f"Grupos no válidos: {invalidos} (usar {GRUPOS})")
+    tamanos = TAMANOS['rapido' if args.rapido else 'completo']
+
+    print(f"[*] Grupos: {', '.join(grupos)} - tamaños: {tamanos} - repeticiones: {args.repeticiones}\n")
+    resultados = ejecutar(grupos, tamanos, args.repeticiones, args.semilla)
+
+    documento = {
+        'meta': {
+            'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _commit_actual(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'repeticiones': args.repeticiones,
+            'semilla': args.semilla,
+        },
+        'resultados': resultados,
+    }
+    for destino in (args.salida, args.guardar_base):
+        if destino:
+            with open(destino, 'w', encoding='utf-8') as f:
+                json.dump(documento, f, indent=2, ensure_ascii=False)
+            print(f"\n[OK] Resultados guardados en: {destino}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        print(f"\n[*] Línea base: {args.comparar} (commit {base['meta'].get('commit')}, {base['meta'].get('fecha')})")
+        regresiones = comparar(resultados, base['resultados'], args.tolerancia)
+        if regresiones:
+            print(f"\n[ERROR] {len(regresiones)} caso(s) con regresión mayor a {args.tolerancia:.0%}")
+            sys.exit(1)
+        print(f"\n[OK] Sin regresiones (tolerancia {args.tolerancia:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Calendario laboral del equipo L1 y diferencias SLA en horas hábiles
+Precalcula un índice acumulado de segundos laborales (turnos, fines de semana, festivos y
+zona horaria del equipo): el tiempo hábil entre dos instantes es W(fin) - W(inicio), dos
+búsquedas binarias y una resta, vectorizado sobre todas las filas con numpy.
+
+Configuración en config.py (CALENDARIO_SLA):
+    zona_horaria:     Zona del equipo (ej: 'America/Bogota')
+    turnos:           Lista de (inicio, fin) en hora local, ej: [('08:00', '12:00'), ('13:00', '18:00')]
+                      o diccionario día de la semana (0=lunes) -> lista de turnos
+    dias_laborales:   Días con turno cuando 'turnos' es una lista (0=lunes ... 6=domingo)
+    festivos:         Fechas 'YYYY-MM-DD' sin turno
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional, List, Dict
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from almacen import fecha_a_epoch, COLUMNAS_DIFERENCIAS_HABILES
+
+CALENDARIO_DEFAULT = {
+    'zona_horaria': 'America/Bogota',
+    'turnos': [('08:00', '18:00')],
+    'dias_laborales': [0, 1, 2, 3, 4],
+    'festivos': [],
+}
+
+# Columna hábil -> (hito de inicio, hito de fin), igual que calcular_diferencias_horas
+PARES_HABILES = dict(zip(COLUMNAS_DIFERENCIAS_HABILES, [
+    ('with RSOC', 'First response'),
+    ('First response', 'with Local Security'),
+    ('First response', 'Closed'),
+]))
+
+
+def cargar_calendario() -> Dict:
+    """Calendario desde config.py (CALENDARIO_SLA); las claves que falten usan CALENDARIO_DEFAULT"""
+    calendario = None
+    try:
+        import config
+        calendario = getattr(config, 'CALENDARIO_SLA', None)
+    except ImportError:
+        pass
+    return dict(CALENDARIO_DEFAULT, **(calendario or {}))
+
+
+def _hora(texto: str) -> time:
+    horas, minutos = texto.split(':')
+    return time(int(horas), int(minutos))
+
+
+def _validar_turnos(turnos: Dict[int, List]):
+    """
+    Verifica que los turnos de la semana no se solapen, incluidos los que cruzan la medianoche
+    hacia el día siguiente (y de domingo a lunes). Lanza ValueError con los turnos en conflicto.
+    """
+    minutos_semana = 7 * 24 * 60
+    tramos = []
+    for dia, lista in turnos.items():
+        for inicio, fin in lista:
+            desde = dia * 24 * 60 + inicio.hour * 60 + inicio.minute
+            hasta = dia * 24 * 60 + fin.hour * 60 + fin.minute + (24 * 60 if fin <= inicio else 0)
+            tramos.append((desde, hasta, dia, inicio, fin))
+    tramos.sort()
+    for k, (desde, hasta, dia, inicio, fin) in enumerate(tramos):
+        if k + 1 < len(tramos):
+            siguiente = tramos[k + 1]
+            solapa = siguiente[0] < hasta
+        elif len(tramos) > 1:
+            siguiente = tramos[0]
+            solapa = siguiente[0] + minutos_semana < hasta
+        else:
+            continue
+        if solapa:
+            raise ValueError(f"Turnos solapados en CALENDARIO_SLA: día {dia} {inicio:%H:%M}-{fin:%H:%M} "
+                             f"y día {siguiente[2]} {siguiente[3]:%H:%M}-{siguiente[4]:%H:%M}")
+
+
+class CalendarioLaboral:
+    """
+    Índice de intervalos laborales en epoch (UTC) ordenados, con los segundos laborales
+    acumulados antes de cada intervalo. Se amplía automáticamente al rango de fechas consultado.
+    """
+
+    def __init__(self, calendario: Optional[Dict] = None):
+        calendario = calendario or cargar_calendario()
+        self.zona = ZoneInfo(calendario['zona_horaria'])
+        turnos = calendario['turnos']
+        if isinstance(turnos, dict):
+            self.turnos = {int(dia): [(_hora(a), _hora(b)) for a, b in lista] for dia, lista in turnos.items()}
+        else:
+            self.turnos = {dia: [(_hora(a), _hora(b)) for a, b in turnos] for dia in calendario['dias_laborales']}
+        # Ordenados por inicio: _construir genera los intervalos en orden para searchsorted
+        self.turnos = {dia: sorted(lista) for dia, lista in self.turnos.items()}
+        _validar_turnos(self.turnos)
+        self.festivos = {date.fromisoformat(f) for f in calendario.get('festivos') or []}
+        self.desde = None
+        self.hasta = None
+        self.inicios = np.empty(0)
+        self.fines = np.empty(0)
+        self.acumulado = np.empty(0)
+
+    def _construir(self, desde: date, hasta: date):
+        """Genera los intervalos laborales de los días [desde, hasta] en la zona del equipo"""
+        inicios, fines = [], []
+        dia = desde
+        while dia <= hasta:
+            if dia not in self.festivos:
+                for inicio, fin in self.turnos.get(dia.weekday(), []):
+                    # La conversión con la zona del equipo respeta cambios de horario (DST)
+                    inicios.append(datetime.combine(dia, inicio, self.zona).timestamp())
+                    fin_dia = dia + timedelta(days=1) if fin <= inicio else dia
+                    fines.append(datetime.combine(fin_dia, fin, self.zona).timestamp())
+            dia += timedelta(days=1)
+        self.desde, self.hasta = desde, hasta
+        self.inicios = np.array(inicios, dtype=np.float64)
+        self.fines = np.array(fines, dtype=np.float64)
+        duraciones = self.fines - self.inicios
+        self.acumulado = np.concatenate(([0.0], np.cumsum(duraciones)[:-1])) if len(duraciones) else duraciones
+
+    def _asegurar_rango(self, epochs: np.ndarray):
+        validos = epochs[~np.isnan(epochs)]
+        if not len(validos):
+            return
+        # Un día de margen a cada lado para cubrir diferencias de zona horaria
+        desde = datetime.fromtimestamp(validos.min(), self.zona).date() - timedelta(days=1)
+        hasta = datetime.fromtimestamp(validos.max(), self.zona).date() + timedelta(days=1)
+        if self.desde is None or desde < self.desde or hasta > self.hasta:
+            self._construir(min(desde, self.desde or desde), max(hasta, self.hasta or hasta))
+
+    def segundos_acumulados(self, epochs: np.ndarray) -> np.ndarray:
+        """W(t): segundos laborales desde el inicio del índice hasta cada instante (NaN se conserva)"""
+        epochs = np.asarray(epochs, dtype=np.float64)
+        self._asegurar_rango(epochs)
+        if not len(self.inicios):
+            return np.where(np.isnan(epochs), np.nan, 0.0)
+        indices = np.searchsorted(self.inicios, np.nan_to_num(epochs), side='right') - 1
+        seguros = np.clip(indices, 0, None)
+        dentro = np.clip(epochs - self.inicios[seguros], 0.0, self.fines[seguros] - self.inicios[seguros])
+        resultado = np.where(indices >= 0, self.acumulado[seguros] + dentro, 0.0)
+        return np.where(np.isnan(epochs), np.nan, resultado)
+
+    def horas_habiles(self, inicios: np.ndarray, fines: np.ndarray) -> np.ndarray:
+        """Horas laborales entre pares de instantes (negativas si fin < inicio)"""
+        return (self.segundos_acumulados(fines) - self.segundos_acumulados(inicios)) / 3600
+
+
+# Formato de fecha de Jira: 2024-01-15T10:30:00.000+0000 (28 caracteres)
+_LARGO_FECHA_JIRA = 28
+_SEPARADORES_FECHA_JIRA = {4: '-', 7: '-', 10: 'T', 13: ':', 16: ':', 19: '.'}
+_DIGITOS_FECHA_JIRA = [p for p in range(_LARGO_FECHA_JIRA) if p not in _SEPARADORES_FECHA_JIRA and p != 23]
+
+
+def _campo(digitos: np.ndarray, desde: int, hasta: int) -> np.ndarray:
+    """Entero formado por las posiciones [desde, hasta) de una matriz de dígitos"""
+    valor = np.zeros(len(digitos), dtype=np.int64)
+    for posicion in range(desde, hasta):
+        valor = valor * 10 + digitos[:, posicion]
+    return valor
+
+
+def _epochs(issues: List[Dict], columna: str) -> np.ndarray:
+    """
+    Epochs (UTC) de una columna de fechas, NaN si está vacía o no se puede interpretar.
+    Las fechas en formato Jira se convierten en bloque: los campos se leen de la matriz de bytes
+    y se arma el datetime64 con aritmética (sin parseo de texto por fila), restando el offset.
+    El resto pasa por fecha_a_epoch.
+    """
+    textos = [str(i.get(columna) or '').strip() for i in issues]
+    resultado = np.full(len(textos), np.nan, dtype=np.float64)
+    jira = np.array([len(t) == _LARGO_FECHA_JIRA and t.isascii() for t in textos], dtype=bool)
+    if jira.any():
+        indices = np.flatnonzero(jira)
+        matriz = np.array([textos[k] for k in indices], dtype=f'S{_LARGO_FECHA_JIRA}')
+        matriz = matriz.view(np.uint8).reshape(-1, _LARGO_FECHA_JIRA)
+        digitos = matriz.astype(np.int64) - ord('0')
+        validas = (digitos[:, _DIGITOS_FECHA_JIRA] >= 0).all(axis=1) & (digitos[:, _DIGITOS_FECHA_JIRA] <= 9).all(axis=1)
+        validas &= (matriz[:, 23] == ord('+')) | (matriz[:, 23] == ord('-'))
+        for posicion, caracter in _SEPARADORES_FECHA_JIRA.items():
+            validas &= matriz[:, posicion] == ord(caracter)
+        
+        # Campos de reloj al estilo de datetime.strptime (%H, %M, %S, offset de 4 dígitos)
+        anio, mes, dia = _campo(digitos, 0, 4), _campo(digitos, 5, 7), _campo(digitos, 8, 10)
+        hora, minuto, segundo = _campo(digitos, 11, 13), _campo(digitos, 14, 16), _campo(digitos, 17, 19)
+        validas &= (anio >= 1) & (mes >= 1) & (mes <= 12) & (dia >= 1) & (hora <= 23) & (minuto <= 59) & (segundo <= 59)
+        mes = np.clip(mes, 1, 12)
+        inicio_mes = ((anio - 1970) * 12 + mes - 1).astype('datetime64[M]').astype('datetime64[D]')
+        dias_mes = ((inicio_mes.astype('datetime64[M]') + 1).astype('datetime64[D]') - inicio_mes).astype(np.int64)
+        validas &= dia <= dias_mes
+        
+        offset = _campo(digitos, 24, 26) * 3600 + _campo(digitos, 26, 28) * 60
+        offset = np.where(matriz[:, 23] == ord('-'), -offset, offset)
+        segundos = ((inicio_mes.astype(np.int64) + dia - 1) * 86400
+                    + hora * 3600 + minuto * 60 + segundo - offset)
+        resultado[indices[validas]] = segundos[validas] + _campo(digitos, 20, 23)[validas] / 1000.0
+        jira[indices[~validas]] = False
+    for k in np.flatnonzero(~jira):
+        if textos[k]:
+            resultado[k] = fecha_a_epoch(textos[k]) or np.nan
+    return resultado
+
+
+def calcular_diferencias_habiles(issues: List[Dict], calendario: Optional[CalendarioLaboral] = None):
+    """
+    Llena las columnas de COLUMNAS_DIFERENCIAS_HABILES en todas las filas (formato "%.2f").
+    Las fechas se convierten respetando su offset de Jira.
+    """
+    if not issues:
+        return
+    calendario = calendario or CalendarioLaboral()
+    epochs = {}
+    for columna, (hito_inicio, hito_fin) in PARES_HABILES.items():
+        for hito in (hito_inicio, hito_fin):
+            if hito not in epochs:
+                epochs[hito] = _epochs(issues, hito)
+        horas = calendario.horas_habiles(epochs[hito_inicio], epochs[hito_fin])
+        for issue_data, valor in zip(issues, horas):
+            issue_data[columna] = '' if np.isnan(valor) else f"{valor:.2f}"
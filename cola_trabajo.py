@@ -0,0 +1,256 @@
+"""
+Cola de trabajo durable (SQLite) para repartir el enriquecimiento entre varios trabajadores
+obtener_issues_jql.py --encolar agrega las claves; cada procesar_csv.py --trabajador arrienda
+lotes con un tiempo de visibilidad, los enriquece y confirma (ack). Si un trabajador se cae,
+sus arriendos vencen y las claves vuelven a estar disponibles para otro.
+
+Por defecto la cola vive en el mismo archivo que el almacén (ALMACEN_DB), así que los
+trabajadores de otros hosts solo necesitan acceso a ese archivo (en un sistema de archivos
+compartido con bloqueos POSIX confiables; no usar sobre NFS sin bloqueos).
+
+Uso:
+    python cola_trabajo.py                 # resumen por estado
+    python cola_trabajo.py --reintentar-fallidas
+"""
+import time
+import sqlite3
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Iterable, Tuple
+
+from almacen import obtener_ruta_almacen
+
+COLA_DEFAULT = 'enriquecimiento'
+VISIBILIDAD_DEFAULT = 300  # segundos que una clave arrendada queda oculta para otros trabajadores
+MAX_INTENTOS_DEFAULT = 5
+ESTADOS = ('pendiente', 'arrendada', 'hecha', 'fallida')
+
+
+def _ahora_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class ColaTrabajo:
+    """
+    Cola con estados pendiente -> arrendada -> hecha (o fallida tras MAX_INTENTOS).
+    'visible_desde' (epoch) indica cuándo una clave pendiente o arrendada puede arrendarse:
+    al arrendar se mueve al vencimiento del arriendo; al hacer nack, al momento del reintento.
+    """
+
+    def __init__(self, ruta: Optional[str] = None, nombre: str = COLA_DEFAULT,
+                 max_intentos: int = MAX_INTENTOS_DEFAULT):
+        self.ruta = ruta or obtener_ruta_almacen()
+        self.nombre = nombre
+        self.max_intentos = max_intentos
+        # Transacciones explícitas (BEGIN IMMEDIATE) para arrendar de forma atómica entre procesos
+        self.conn = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA busy_timeout=30000')
+        self._crear_esquema()
+
+    def _crear_esquema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cola (
+                cola TEXT NOT NULL,
+                clave TEXT NOT NULL,
+                prioridad REAL NOT NULL DEFAULT 0,
+                estado TEXT NOT NULL,
+                intentos INTEGER NOT NULL DEFAULT 0,
+                visible_desde REAL NOT NULL,
+                trabajador TEXT,
+                error TEXT,
+                encolada_en TEXT NOT NULL,
+                actualizada_en TEXT NOT NULL,
+                PRIMARY KEY (cola, clave)
+            );
+            CREATE INDEX IF NOT EXISTS idx_cola_disponibles ON cola(cola, estado, visible_desde, prioridad);
+        """)
+
+    def cerrar(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+    def _transaccion(self, funcion):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            resultado = funcion()
+            self.conn.execute('COMMIT')
+            return resultado
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    def encolar(self, claves: Iterable, prioridad: float = 0.0) -> int:
+        """
+        Agrega claves como pendientes. Acepta claves o tuplas (clave, prioridad).
+        Una clave ya hecha o fallida vuelve a quedar pendiente (nuevo descubrimiento = re-enriquecer);
+        una clave arrendada conserva su arriendo.
+
+        Returns:
+            Número de claves encoladas
+        """
+        ahora, ahora_iso = time.time(), _ahora_iso()
+        filas = []
+        for elemento in claves:
+            clave, prioridad_clave = elemento if isinstance(elemento, tuple) else (elemento, prioridad)
+            clave = (clave or '').strip()
+            if clave:
+                filas.append((self.nombre, clave, float(prioridad_clave), ahora, ahora_iso, ahora_iso))
+
+        def insertar():
+            self.conn.executemany("""
+                INSERT INTO cola (cola, clave, prioridad, estado, intentos, visible_desde, encolada_en, actualizada_en)
+                VALUES (?, ?, ?, 'pendiente', 0, ?, ?, ?)
+                ON CONFLICT(cola, clave) DO UPDATE SET
+                    prioridad = excluded.prioridad,
+                    estado = CASE WHEN cola.estado = 'arrendada' THEN cola.estado ELSE 'pendiente' END,
+                    intentos = CASE WHEN cola.estado = 'arrendada' THEN cola.intentos ELSE 0 END,
+                    visible_desde = CASE WHEN cola.estado = 'arrendada' THEN cola.visible_desde
+                                         ELSE excluded.visible_desde END,
+                    error = CASE WHEN cola.estado = 'arrendada' THEN cola.error ELSE NULL END,
+                    actualizada_en = excluded.actualizada_en
+            """, filas)
+        self._transaccion(insertar)
+        return len(filas)
+
+    def arrendar(self, trabajador: str, cantidad: int = 10,
+                 visibilidad: float = VISIBILIDAD_DEFAULT) -> List[str]:
+        """
+        Arrienda hasta `cantidad` claves disponibles (pendientes o con arriendo vencido),
+        de mayor a menor prioridad. Las claves que agotaron sus intentos pasan a 'fallida'.
+
+        Returns:
+            Claves arrendadas (vacío si no hay disponibles ahora)
+        """
+        def tomar():
+            ahora = time.time()
+            # Arriendos vencidos que ya no tienen intentos: a fallida (trabajador caído repetidamente)
+            self.conn.execute("""
+                UPDATE cola SET estado = 'fallida', error = COALESCE(error, 'arriendo vencido'),
+                                actualizada_en = ?
+                WHERE cola = ? AND estado = 'arrendada' AND visible_desde <= ? AND intentos >= ?
+            """, (_ahora_iso(), self.nombre, ahora, self.max_intentos))
+            claves = [fila['clave'] for fila in self.conn.execute("""
+                SELECT clave FROM cola
+                WHERE cola = ? AND estado IN ('pendiente', 'arrendada') AND visible_desde <= ?
+                ORDER BY prioridad DESC, encolada_en, clave
+                LIMIT ?
+            """, (self.nombre, ahora, cantidad))]
+            self.conn.executemany("""
+                UPDATE cola SET estado = 'arrendada', trabajador = ?, intentos = intentos + 1,
+                                visible_desde = ?, actualizada_en = ?
+                WHERE cola = ? AND clave = ?
+            """, [(trabajador, ahora + visibilidad, _ahora_iso(), self.nombre, c) for c in claves])
+            return claves
+        return self._transaccion(tomar)
+
+    def _del_trabajador(self, sql: str, parametros: List[Tuple]) -> int:
+        def ejecutar():
+            cursor = self.conn.executemany(sql, parametros)
+            return cursor.rowcount
+        return self._transaccion(ejecutar)
+
+    def ack(self, claves: List[str], trabajador: str) -> int:
+        """
+        Confirma claves enriquecidas. Solo aplica si el arriendo sigue siendo de este trabajador
+        (si venció y otro la tomó, la confirmación la hará el otro).
+
+        Returns:
+            Número de claves confirmadas
+        """
+        ahora_iso = _ahora_iso()
+        return self._del_trabajador("""
+            UPDATE cola SET estado = 'hecha', error = NULL, actualizada_en = ?
+            WHERE cola = ? AND clave = ? AND estado = 'arrendada' AND trabajador = ?
+        """, [(ahora_iso, self.nombre, c, trabajador) for c in claves])
+
+    def nack(self, claves: List[str], trabajador: str, error: Optional[str] = None,
+             reintentar_en: float = 0) -> int:
+        """
+        Devuelve claves a la cola para reintentarlas después de `reintentar_en` segundos
+        (o las marca 'fallida' si agotaron sus intentos).
+
+        Returns:
+            Número de claves devueltas
+        """
+        visible = time.time() + reintentar_en
+        ahora_iso = _ahora_iso()
+        return self._del_trabajador("""
+            UPDATE cola SET estado = CASE WHEN intentos >= ? THEN 'fallida' ELSE 'pendiente' END,
+                            visible_desde = ?, error = ?, actualizada_en = ?
+            WHERE cola = ? AND clave = ? AND estado = 'arrendada' AND trabajador = ?
+        """, [(self.max_intentos, visible, error, ahora_iso, self.nombre, c, trabajador) for c in claves])
+
+    def liberar(self, claves: List[str], trabajador: str) -> int:
+        """
+        Devuelve claves arrendadas que no se llegaron a procesar (ej: presupuesto agotado a mitad
+        de lote): quedan pendientes y visibles de inmediato, sin consumir un intento.
+
+        Returns:
+            Número de claves liberadas
+        """
+        ahora_iso = _ahora_iso()
+        return self._del_trabajador("""
+            UPDATE cola SET estado = 'pendiente', intentos = MAX(intentos - 1, 0),
+                            visible_desde = ?, actualizada_en = ?
+            WHERE cola = ? AND clave = ? AND estado = 'arrendada' AND trabajador = ?
+        """, [(time.time(), ahora_iso, self.nombre, c, trabajador) for c in claves])
+
+    def extender(self, claves: List[str], trabajador: str, visibilidad: float = VISIBILIDAD_DEFAULT) -> int:
+        """Extiende el arriendo de claves que siguen en proceso (latido de un lote largo)"""
+        visible = time.time() + visibilidad
+        return self._del_trabajador("""
+            UPDATE cola SET visible_desde = ?
+            WHERE cola = ? AND clave = ? AND estado = 'arrendada' AND trabajador = ?
+        """, [(visible, self.nombre, c, trabajador) for c in claves])
+
+    def segundos_hasta_disponible(self) -> Optional[float]:
+        """
+        Segundos hasta que haya una clave arrendable (0 si ya hay).
+        None si no quedan claves pendientes ni arrendadas: la cola está terminada.
+        """
+        fila = self.conn.execute("""
+            SELECT MIN(visible_desde) AS proxima FROM cola
+            WHERE cola = ? AND estado IN ('pendiente', 'arrendada')
+        """, (self.nombre,)).fetchone()
+        if fila['proxima'] is None:
+            return None
+        return max(0.0, fila['proxima'] - time.time())
+
+    def resumen(self) -> Dict[str, int]:
+        """Número de claves por estado"""
+        conteos = {estado: 0 for estado in ESTADOS}
+        for fila in self.conn.execute(
+                "SELECT estado, COUNT(*) AS n FROM cola WHERE cola = ? GROUP BY estado", (self.nombre,)):
+            conteos[fila['estado']] = fila['n']
+        return conteos
+
+    def reintentar_fallidas(self) -> int:
+        """Vuelve a dejar pendientes las claves fallidas (con intentos en cero)"""
+        def reintentar():
+            return self.conn.execute("""
+                UPDATE cola SET estado = 'pendiente', intentos = 0, visible_desde = ?, actualizada_en = ?
+                WHERE cola = ? AND estado = 'fallida'
+            """, (time.time(), _ahora_iso(), self.nombre)).rowcount
+        return self._transaccion(reintentar)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Estado de la cola de trabajo de enriquecimiento')
+    parser.add_argument('--cola', default=COLA_DEFAULT)
+    parser.add_argument('--reintentar-fallidas', action='store_true', help='Devolver las claves fallidas a pendiente')
+    args = parser.parse_args()
+
+    with ColaTrabajo(nombre=args.cola) as cola:
+        if args.reintentar_fallidas:
+            print(f"[OK] {cola.reintentar_fallidas()} claves fallidas devueltas a la cola")
+        print(f"[*] Cola '{cola.nombre}' en {cola.ruta}:")
+        for estado, n in cola.resumen().items():
+            print(f"    {estado}: {n}")
@@ -15,3 +15,74 @@ FIRST_RESPONSE_ASSIGNEES = [
     'Persona 2',
     'Persona 3'
 ]
+
+# Ruta del almacén SQLite de issues e hitos (opcional, por defecto jira_hitos.db)
+# ALMACEN_DB = 'jira_hitos.db'
+
+# Hitos SLA (opcional). Si no se define se usan "with RSOC", "with Local Security",
+# "Closed" y First response (asignación a FIRST_RESPONSE_ASSIGNEES).
+# Todos los hitos se calculan en una sola pasada del changelog de cada issue.
+#   campo: campo del changelog ('status', 'assignee', ...)
+#   regla: 'contiene', 'igual' o 'en_lista' (valor=None usa FIRST_RESPONSE_ASSIGNEES)
+#   ocurrencia: 'primera' o 'ultima'
+#   jql:        (opcional) predicado JQL para la poda previa, ej. para First response:
+#               'jql': 'assignee WAS IN (5b10ac8d82e05b22cc7d4ef5, 5b10a2844c20165700ede21g)'
+# HITOS_SLA = [
+#     {'columna': 'with RSOC', 'campo': 'status', 'regla': 'contiene', 'valor': 'with RSOC', 'ocurrencia': 'primera'},
+#     {'columna': 'with Local Security', 'campo': 'status', 'regla': 'contiene', 'valor': 'with Local Security', 'ocurrencia': 'primera'},
+#     {'columna': 'Closed', 'campo': 'status', 'regla': 'contiene', 'valor': 'Closed', 'ocurrencia': 'primera'},
+#     {'columna': 'First response', 'campo': 'assignee', 'regla': 'en_lista', 'valor': None, 'ocurrencia': 'primera'},
+# ]
+
+# Agrupaciones del resumen SLA (hoja "Resumen SLA"): 'dia', 'semana', 'asignado'
+# SLA_AGRUPACIONES = ['dia', 'semana', 'asignado']
+
+# Calendario laboral del equipo L1 para las columnas en horas hábiles (I.* (hábiles))
+# CALENDARIO_SLA = {
+#     'zona_horaria': 'America/Bogota',
+#     'turnos': [('08:00', '18:00')],          # o {0: [('08:00', '18:00')], 5: [('09:00', '13:00')]}
+#                                               # (sin solapes; ('22:00', '06:00') cruza la medianoche)
+#     'dias_laborales': [0, 1, 2, 3, 4],        # 0=lunes ... 6=domingo
+#     'festivos': ['2026-01-01', '2026-01-12'],
+# }
+
+# Secreto para validar la firma (X-Hub-Signature) de los webhooks de Jira (opcional)
+# WEBHOOK_SECRET = 'secreto-del-webhook'
+
+# Caché de changelog en memoria (LRU + TTL, descargas concurrentes deduplicadas)
+# CHANGELOG_CACHE_SIZE = 2048   # máximo de issues en caché (0 desactiva la caché)
+# CHANGELOG_CACHE_TTL = 900     # segundos
+
+# Descubrimiento de claves en paralelo (obtener_issues_jql.py):
+# la ventana de 720h se divide en JQL_SLICES rangos de 'created', JQL_WORKERS a la vez
+# JQL_SLICES = 30
+# JQL_WORKERS = 8
+
+# Formatos de salida de procesar_csv.py: 'xlsx', 'csv', 'parquet', 'arrow' (parquet/arrow requieren pyarrow)
+# Sin configurar se usa el formato del archivo de entrada (según su extensión)
+# FORMATOS_SALIDA = ['xlsx', 'parquet']
+
+# Salida particionada por semana ISO de creación (procesar_csv.py --particiones DIR):
+# solo se procesan las semanas abiertas; se sellan las semanas fuera de la ventana de 720h
+# con todos sus issues cerrados
+# DIRECTORIO_PARTICIONES = 'particiones'
+
+# Poda JQL antes del PASO 1: unas búsquedas 'issuekey IN (...) AND (status CHANGED TO "a" OR ...)'
+# por hito evitan descargar changelogs de issues que no pueden tener ningún hito (equivale a no usar
+# --sin-poda). Solo se aplica si todos los hitos tienen predicado (los de assignee necesitan 'jql');
+# con los HITOS_SLA por defecto se omite
+# PODA_JQL = True
+
+# Presupuesto de tiempo (segundos desde el inicio) para el enriquecimiento de procesar_csv.py.
+# Se procesan primero los issues abiertos, con hitos faltantes y actualizados recientemente;
+# al agotarse se escriben los resultados parciales (equivale a --presupuesto)
+# PRESUPUESTO_SEGUNDOS = 18000
+
+# Archivo local de changelogs crudos (<base>.dat + <base>.idx) para recalcular hitos sin Jira
+# ('' lo desactiva): python archivo_changelog.py recalcular Libro1.xlsx
+# ARCHIVO_CHANGELOG = 'changelog_archivo'
+
+# Grabación / reproducción de respuestas REST de Jira (opcional)
+#   'live': normal | 'record': graba cada respuesta en el cassette | 'replay': sin red
+# JIRA_HTTP_MODE = 'live'
+# JIRA_CASSETTE = 'jira_cassette.jsonl.gz'
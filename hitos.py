@@ -0,0 +1,200 @@
+"""
+Definiciones declarativas de hitos SLA y evaluador de changelog en una sola pasada.
+
+Cada hito se define con:
+    columna:    Nombre de la columna de salida (ej: 'with RSOC')
+    campo:      Campo del changelog a observar (ej: 'status', 'assignee')
+    regla:      'contiene' (subcadena), 'igual' (texto exacto) o 'en_lista'
+                (coincidencia parcial con alguno de los valores de la lista)
+    valor:      Texto o lista de textos a buscar (sin distinguir mayúsculas)
+    ocurrencia: 'primera' (más antigua, por defecto) o 'ultima' (más reciente)
+    jql:        (Opcional) Predicado JQL que cumple todo issue que puede tener el hito, para
+                la poda previa (ej: 'assignee WAS IN (5b10ac8d82e05b22cc7d4ef5)'). Los hitos de
+                status no lo necesitan: se usa 'status CHANGED TO "..."' con el catálogo de estados
+                (una cláusula por estado, unidas con OR)
+
+Las definiciones se cargan de config.py (HITOS_SLA); si no existen se usan las del proceso
+original: "with RSOC", "with Local Security", "Closed" y First response (FIRST_RESPONSE_ASSIGNEES).
+El hito de status de la columna COLUMNA_CIERRE define además qué estados son terminales
+(planificación por prioridad y sellado de particiones).
+"""
+import os
+from typing import Optional, List, Dict
+
+REGLAS_VALIDAS = ('contiene', 'igual', 'en_lista')
+OCURRENCIAS_VALIDAS = ('primera', 'ultima')
+
+# Columna del hito de cierre: su regla decide si un estado actual es cerrado
+COLUMNA_CIERRE = 'Closed'
+
+
+def cargar_first_response_assignees() -> List[str]:
+    """Lista de personas para First response desde config.py o variable de entorno"""
+    try:
+        import config
+        target_assignees = getattr(config, 'FIRST_RESPONSE_ASSIGNEES', [])
+        if not target_assignees:
+            print("[!] Advertencia: No se encontró FIRST_RESPONSE_ASSIGNEES en config.py")
+            target_assignees = []
+    except ImportError:
+        # Si no hay config.py, intentar desde variables de entorno
+        assignees_str = os.getenv('FIRST_RESPONSE_ASSIGNEES', '')
+        if assignees_str:
+            target_assignees = [a.strip() for a in assignees_str.split(',') if a.strip()]
+        else:
+            print("[!] Advertencia: No se encontró configuración de FIRST_RESPONSE_ASSIGNEES")
+            target_assignees = []
+    return list(target_assignees)
+
+
+def definiciones_por_defecto(target_assignees: Optional[List[str]] = None) -> List[Dict]:
+    """Hitos del proceso original (antes estaban fijos en procesar_csv)"""
+    if target_assignees is None:
+        target_assignees = cargar_first_response_assignees()
+    return [
+        {'columna': 'with RSOC', 'campo': 'status', 'regla': 'contiene', 'valor': 'with RSOC', 'ocurrencia': 'primera'},
+        {'columna': 'with Local Security', 'campo': 'status', 'regla': 'contiene', 'valor': 'with Local Security', 'ocurrencia': 'primera'},
+        {'columna': 'Closed', 'campo': 'status', 'regla': 'contiene', 'valor': 'Closed', 'ocurrencia': 'primera'},
+        {'columna': 'First response', 'campo': 'assignee', 'regla': 'en_lista', 'valor': target_assignees, 'ocurrencia': 'primera'},
+    ]
+
+
+def validar_definicion(definicion: Dict) -> Dict:
+    """
+    Valida y normaliza una definición de hito.
+
+    Raises:
+        ValueError: Si falta un campo obligatorio o la regla/ocurrencia no es válida
+    """
+    for obligatorio in ('columna', 'campo', 'valor'):
+        if not definicion.get(obligatorio) and definicion.get(obligatorio) != []:
+            raise ValueError(f"Definición de hito inválida, falta '{obligatorio}': {definicion}")
+
+    regla = definicion.get('regla', 'contiene')
+    ocurrencia = definicion.get('ocurrencia', 'primera')
+    if regla not in REGLAS_VALIDAS:
+        raise ValueError(f"Regla '{regla}' no válida para '{definicion['columna']}' (usar {REGLAS_VALIDAS})")
+    if ocurrencia not in OCURRENCIAS_VALIDAS:
+        raise ValueError(f"Ocurrencia '{ocurrencia}' no válida para '{definicion['columna']}' (usar {OCURRENCIAS_VALIDAS})")
+
+    if definicion.get('jql') is not None and not isinstance(definicion['jql'], str):
+        raise ValueError(f"El campo 'jql' de '{definicion['columna']}' debe ser texto")
+
+    valor = definicion['valor']
+    valores = [valor] if isinstance(valor, str) else list(valor)
+    normalizada = dict(definicion)
+    normalizada.update({
+        'campo': definicion['campo'].lower(),
+        'regla': regla,
+        'ocurrencia': ocurrencia,
+        # Valores normalizados para comparar sin distinguir mayúsculas
+        '_valores': [v.lower().strip() for v in valores if v and v.strip()],
+    })
+    return normalizada
+
+
+def cargar_definiciones_hitos() -> List[Dict]:
+    """Carga las definiciones de hitos desde config.py (HITOS_SLA) o las de por defecto"""
+    definiciones = None
+    try:
+        import config
+        definiciones = getattr(config, 'HITOS_SLA', None)
+    except ImportError:
+        pass
+
+    if not definiciones:
+        definiciones = definiciones_por_defecto()
+    else:
+        # Las reglas en_lista sin valor usan FIRST_RESPONSE_ASSIGNEES
+        definiciones = [
+            dict(d, valor=cargar_first_response_assignees()) if d.get('regla') == 'en_lista' and d.get('valor') is None else d
+            for d in definiciones
+        ]
+
+    normalizadas = [validar_definicion(d) for d in definiciones]
+    columnas = [d['columna'] for d in normalizadas]
+    if len(set(columnas)) != len(columnas):
+        raise ValueError(f"Columnas de hitos duplicadas: {columnas}")
+    return normalizadas
+
+
+def coincide(definicion: Dict, texto: str) -> bool:
+    """Aplica la regla de coincidencia de una definición (ya normalizada) a un valor del changelog"""
+    if not texto:
+        return False
+    texto = texto.lower().strip()
+    regla = definicion['regla']
+    if regla == 'contiene':
+        return any(v in texto for v in definicion['_valores'])
+    if regla == 'igual':
+        return texto in definicion['_valores']
+    # en_lista: coincidencia parcial en ambos sentidos (nombres completos o parciales)
+    return any(v in texto or texto in v for v in definicion['_valores'])
+
+
+def definicion_cierre(definiciones: List[Dict]) -> Optional[Dict]:
+    """Definición del hito de cierre (columna COLUMNA_CIERRE sobre status), None si no está configurada"""
+    return next((d for d in definiciones if d['columna'] == COLUMNA_CIERRE and d['campo'] == 'status'), None)
+
+
+def estado_cerrado(definicion: Optional[Dict], estado: Optional[str]) -> bool:
+    """Un estado es terminal si cumple la regla del hito de cierre"""
+    return definicion is not None and coincide(definicion, estado or '')
+
+
+class HitoCompilado:
+    """
+    Definición de hito resuelta contra los catálogos de JiraIntegration.
+    Compara IDs enteros internados: la regla de texto se evalúa una sola vez por ID.
+    """
+    __slots__ = ('columna', 'field_id', 'primera', '_definicion', '_nombre_de', '_memo')
+
+    def __init__(self, definicion: Dict, field_id: int, nombre_de):
+        self.columna = definicion['columna']
+        self.field_id = field_id
+        self.primera = definicion['ocurrencia'] == 'primera'
+        self._definicion = definicion
+        self._nombre_de = nombre_de  # id -> nombre (ej: nombre del estado o de la persona)
+        self._memo = {}
+
+    def coincide_id(self, valor_id) -> bool:
+        resultado = self._memo.get(valor_id)
+        if resultado is None:
+            resultado = valor_id is not None and coincide(self._definicion, self._nombre_de(valor_id))
+            self._memo[valor_id] = resultado
+        return resultado
+
+
+def evaluar_eventos(eventos: List, compilados: List[HitoCompilado]) -> Dict[str, Optional[object]]:
+    """
+    Calcula todos los hitos configurados en un solo recorrido de los eventos compactos
+    (ver jira_integration.ChangelogEvent) ya ordenados del más antiguo al más nuevo,
+    comparando field_id y to_id enteros. Es el único evaluador: lo usan la ejecución en vivo,
+    los webhooks y el recálculo offline (ver jira_integration.CatalogoChangelog).
+
+    Returns:
+        Diccionario columna -> evento encontrado o None
+    """
+    resultados = {c.columna: None for c in compilados}
+    por_campo = {}
+    for compilado in compilados:
+        if compilado._definicion['_valores']:
+            por_campo.setdefault(compilado.field_id, []).append(compilado)
+    pendientes_primera = sum(1 for cs in por_campo.values() for c in cs if c.primera)
+    hay_ultima = any(not c.primera for cs in por_campo.values() for c in cs)
+
+    for evento in eventos:
+        compilados_campo = por_campo.get(evento.field_id)
+        if not compilados_campo:
+            continue
+        for compilado in compilados_campo:
+            if compilado.primera and resultados[compilado.columna] is not None:
+                continue
+            if compilado.coincide_id(evento.to_id):
+                if compilado.primera:
+                    pendientes_primera -= 1
+                resultados[compilado.columna] = evento
+        if not pendientes_primera and not hay_ultima:
+            break
+
+    return resultados
@@ -7,16 +7,426 @@ import os
 from dotenv import load_dotenv
 from jira import JIRA
 import csv
-from datetime import datetime
-from typing import Optional, List, Dict
+import sys
+import gzip
+import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Callable
 import requests
 from requests.auth import HTTPBasicAuth
+from hitos import validar_definicion, coincide, HitoCompilado, evaluar_eventos
+from archivo_changelog import ArchivoChangelog, changelog_desde_historias, obtener_ruta_archivo
 
 # Load environment variables
 load_dotenv()
 
-class JiraIntegration:
+# Valores por defecto de la caché de changelog (configurables en config.py)
+CHANGELOG_CACHE_SIZE_DEFAULT = 2048
+CHANGELOG_CACHE_TTL_DEFAULT = 900  # segundos
+
+# Claves por búsqueda en la poda JQL (issuekey IN (...)); mantiene la consulta corta
+PODA_LOTE_DEFAULT = 100
+
+
+class ChangelogNoDisponible(Exception):
+    """Ningún método pudo descargar el changelog (error de red, HTTP o permisos), distinto de un changelog vacío"""
+
+
+class _LlamadaEnCurso:
+    """Descarga en curso compartida por todos los que piden la misma clave"""
+    __slots__ = ('evento', 'resultado', 'error')
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class _ChangelogCache:
+    """
+    Caché en memoria con semántica single-flight:
+    - Las peticiones concurrentes de la misma clave comparten una sola descarga en curso
+    - Los resultados se guardan con expiración (TTL) y desalojo LRU al superar max_entries
+    - Los errores (ChangelogNoDisponible) y los resultados vacíos no se guardan, para poder reintentar
+    """
+
+    def __init__(self, max_entries: int = CHANGELOG_CACHE_SIZE_DEFAULT, ttl: float = CHANGELOG_CACHE_TTL_DEFAULT):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # clave -> (expira_en, valor)
+        self._en_curso = {}  # clave -> _LlamadaEnCurso
+
+    def get_or_fetch(self, key: str, fetch: Callable[[str], List]) -> List:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+            llamada = self._en_curso.get(key)
+            es_lider = llamada is None
+            if es_lider:
+                llamada = _LlamadaEnCurso()
+                self._en_curso[key] = llamada
+
+        # Otro hilo ya está descargando esta clave: esperar su resultado
+        if not es_lider:
+            llamada.evento.wait()
+            if llamada.error is not None:
+                raise llamada.error
+            return llamada.resultado
+
+        try:
+            llamada.resultado = fetch(key)
+        except BaseException as e:
+            llamada.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._en_curso[key]
+                if llamada.error is None and llamada.resultado and self.max_entries > 0 and self.ttl > 0:
+                    self._entries[key] = (time.monotonic() + self.ttl, llamada.resultado)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            llamada.evento.set()
+        return llamada.resultado
+
+    def invalidate(self, key: Optional[str] = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+# Modos HTTP: 'live' (normal), 'record' (graba cada respuesta REST) y 'replay' (sin red)
+HTTP_MODES = ('live', 'record', 'replay')
+CASSETTE_PATH_DEFAULT = 'jira_cassette.jsonl.gz'
+
+
+class _RespuestaGrabada:
+    """Respuesta HTTP reproducida desde el cassette (misma interfaz usada de requests.Response)"""
+
+    def __init__(self, status_code: int, text: str, url: str):
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} (cassette) para {self.url}", response=self)
+
+
+class _Cassette:
+    """
+    Cassette comprimido (gzip, una línea JSON por respuesta) con las respuestas REST de Jira.
+    Las peticiones se identifican por método, ruta relativa al servidor y cuerpo JSON.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._respuestas = None
+        self._meta = None
+
+    @staticmethod
+    def _clave(method: str, ruta: str, body) -> str:
+        return f"{method.upper()} {ruta} {json.dumps(body, sort_keys=True) if body is not None else ''}"
+
+    def grabar(self, method: str, ruta: str, body, response):
+        registro = {'method': method.upper(), 'path': ruta, 'body': body,
+                    'status': response.status_code, 'text': response.text}
+        linea = json.dumps(registro, ensure_ascii=False) + '\n'
+        # Cada escritura agrega un miembro gzip; gzip.open los lee como un solo flujo
+        with self._lock, gzip.open(self.ruta, 'at', encoding='utf-8') as f:
+            f.write(linea)
+
+    def grabar_meta(self, nombre: str, valor):
+        """Graba un valor no HTTP necesario para reproducir la ejecución (ej: hora actual, tipo de Jira)"""
+        linea = json.dumps({'meta': nombre, 'value': valor}, ensure_ascii=False) + '\n'
+        with self._lock, gzip.open(self.ruta, 'at', encoding='utf-8') as f:
+            f.write(linea)
+
+    def leer_meta(self, nombre: str, default=None):
+        """Valores grabados con grabar_meta, en el mismo orden; el último se repite si se piden más"""
+        with self._lock:
+            if self._respuestas is None:
+                self._respuestas, self._meta = self._cargar()
+            valores = self._meta.get(nombre)
+            if not valores:
+                return default
+            return valores.pop(0) if len(valores) > 1 else valores[0]
+
+    def _cargar(self):
+        respuestas, meta = {}, {}
+        if os.path.exists(self.ruta):
+            with gzip.open(self.ruta, 'rt', encoding='utf-8') as f:
+                for linea in f:
+                    if linea.strip():
+                        registro = json.loads(linea)
+                        if 'meta' in registro:
+                            meta.setdefault(registro['meta'], []).append(registro['value'])
+                            continue
+                        clave = self._clave(registro['method'], registro['path'], registro.get('body'))
+                        # Si una petición se grabó varias veces, se usa la más reciente
+                        respuestas[clave] = (registro['status'], registro['text'])
+        return respuestas, meta
+
+    def reproducir(self, method: str, ruta: str, body) -> _RespuestaGrabada:
+        with self._lock:
+            if self._respuestas is None:
+                self._respuestas, self._meta = self._cargar()
+        grabada = self._respuestas.get(self._clave(method, ruta, body))
+        if grabada is None:
+            print(f"[DEBUG] Petición no grabada en el cassette: {method.upper()} {ruta}")
+            return _RespuestaGrabada(404, '{}', ruta)
+        return _RespuestaGrabada(grabada[0], grabada[1], ruta)
+
+
+# Campos del changelog cuyos valores son usuarios (se internan en el catálogo de usuarios)
+USER_FIELDS = ('assignee', 'reporter')
+
+
+class _Catalogo:
+    """
+    Tabla de internado: cada clave distinta recibe un ID entero estable y guarda su nombre visible
+    y el ID original de Jira (accountId, ID de opción, etc.) si el changelog lo trae
+    """
+
     def __init__(self):
+        self._ids = {}
+        self.nombres = []
+        self.ids_jira = []
+
+    def intern(self, clave, nombre: Optional[str] = None, id_jira: Optional[str] = None) -> Optional[int]:
+        if clave is None or clave == '':
+            return None
+        id_ = self._ids.get(clave)
+        if id_ is None:
+            id_ = len(self.nombres)
+            self._ids[clave] = id_
+            self.nombres.append(sys.intern(nombre if nombre is not None else str(clave)))
+            self.ids_jira.append(id_jira)
+        else:
+            if nombre and not self.nombres[id_]:
+                self.nombres[id_] = sys.intern(nombre)
+            if id_jira is not None and self.ids_jira[id_] is None:
+                self.ids_jira[id_] = id_jira
+        return id_
+
+    def nombre(self, id_: Optional[int]) -> str:
+        return self.nombres[id_] if id_ is not None and 0 <= id_ < len(self.nombres) else ''
+
+    def id_jira(self, id_: Optional[int]) -> Optional[str]:
+        return self.ids_jira[id_] if id_ is not None and 0 <= id_ < len(self.ids_jira) else None
+
+
+class ChangelogEvent:
+    """
+    Cambio compacto del changelog: IDs internados y fecha como epoch en milisegundos.
+    - status: from_id/to_id son los IDs de estado de Jira (catálogo de estados)
+    - campos de usuario: IDs del catálogo de usuarios (accountId / username)
+    - otros campos: IDs del catálogo de valores (texto e ID de Jira)
+    """
+    __slots__ = ('epoch_ms', 'tz_min', 'field_id', 'from_id', 'to_id', 'author_id')
+
+    def __init__(self, epoch_ms: int, tz_min: int, field_id: int,
+                 from_id: Optional[int], to_id: Optional[int], author_id: Optional[int]):
+        self.epoch_ms = epoch_ms
+        self.tz_min = tz_min
+        self.field_id = field_id
+        self.from_id = from_id
+        self.to_id = to_id
+        self.author_id = author_id
+
+
+def _parse_fecha_jira(texto) -> tuple:
+    """'2025-12-30T19:15:15.375-0500' -> (epoch en ms, offset en minutos); (-1, 0) si no se puede leer"""
+    if not texto:
+        return -1, 0
+    for formato in ('%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z'):
+        try:
+            dt = datetime.strptime(str(texto), formato)
+            return int(round(dt.timestamp() * 1000)), int(dt.utcoffset().total_seconds() // 60)
+        except ValueError:
+            continue
+    return -1, 0
+
+
+def _formatear_fecha_jira(epoch_ms: int, tz_min: int) -> str:
+    """Inverso de _parse_fecha_jira: reconstruye la fecha en el formato y offset originales de Jira"""
+    if epoch_ms < 0:
+        return ''
+    dt = datetime.fromtimestamp(epoch_ms / 1000, timezone(timedelta(minutes=tz_min)))
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}" + dt.strftime('%z')
+
+
+class CatalogoChangelog:
+    """
+    Catálogos de internado (estados, usuarios, campos y valores) y evaluación de hitos sobre
+    eventos compactos. JiraIntegration, el receptor de webhooks y el recálculo desde el archivo
+    de changelogs comparten esta ruta: eventos ordenados por epoch y coincidencia por IDs.
+    """
+
+    def __init__(self, estados: Optional[Dict] = None):
+        self.lock = threading.Lock()
+        self.status_names = {}  # ID de estado de Jira -> nombre
+        self.users = _Catalogo()
+        self.fields = _Catalogo()
+        self.values = _Catalogo()
+        self._compilados = {}
+        if estados:
+            self.registrar_estados(estados)
+
+    def registrar_estados(self, estados: Dict):
+        """Agrega el catálogo de estados de Jira (ID -> nombre actual; manda sobre los nombres del changelog)"""
+        with self.lock:
+            for id_, nombre in estados.items():
+                try:
+                    self.status_names[int(id_)] = sys.intern(nombre or '')
+                except (TypeError, ValueError):
+                    continue
+            # Las coincidencias memorizadas por ID pueden cambiar con los nombres nuevos
+            self._compilados.clear()
+
+    def _status_id(self, raw_id, nombre: Optional[str]) -> Optional[int]:
+        """ID entero de un estado; registra el nombre si el catálogo no lo conocía"""
+        try:
+            id_ = int(raw_id)
+        except (TypeError, ValueError):
+            if not nombre:
+                return None
+            # Estado sin ID numérico: asignar un ID sintético negativo por nombre
+            id_ = next((i for i, n in self.status_names.items() if i < 0 and n == nombre),
+                       -1 - sum(1 for i in self.status_names if i < 0))
+        if id_ not in self.status_names and nombre:
+            self.status_names[id_] = sys.intern(nombre)
+        return id_
+
+    def _valor_id(self, texto: Optional[str], id_jira: Optional[str]) -> Optional[int]:
+        """ID entero de un valor de otro campo; el mismo texto con IDs de Jira distintos no se mezcla"""
+        if not id_jira:
+            return self.values.intern(texto)
+        return self.values.intern((texto, id_jira), texto or '', id_jira)
+
+    def compactar(self, changelog: List[Dict]) -> List[ChangelogEvent]:
+        """Convierte cambios con el formato de get_changelog en eventos compactos ordenados por fecha"""
+        eventos = []
+        with self.lock:
+            for change in changelog:
+                field = (change.get('field') or '').lower()
+                field_id = self.fields.intern(field, change.get('field'))
+                if field == 'status':
+                    from_id = self._status_id(change.get('from_id'), change.get('from'))
+                    to_id = self._status_id(change.get('to_id'), change.get('to'))
+                elif field in USER_FIELDS:
+                    from_id = self.users.intern(change.get('from_id') or change.get('from'), change.get('from'),
+                                                change.get('from_id'))
+                    to_id = self.users.intern(change.get('to_id') or change.get('to'), change.get('to'),
+                                              change.get('to_id'))
+                else:
+                    from_id = self._valor_id(change.get('from'), change.get('from_id'))
+                    to_id = self._valor_id(change.get('to'), change.get('to_id'))
+                author_id = self.users.intern(change.get('author_id') or change.get('author'), change.get('author'))
+                epoch_ms, tz_min = _parse_fecha_jira(change.get('date'))
+                eventos.append(ChangelogEvent(epoch_ms, tz_min, field_id, from_id, to_id, author_id))
+        eventos.sort(key=lambda e: e.epoch_ms)
+        return eventos
+
+    def nombre_valor(self, field: str, valor_id: Optional[int]) -> str:
+        """Nombre visible de un ID según el tipo de campo"""
+        if valor_id is None:
+            return ''
+        if field == 'status':
+            return self.status_names.get(valor_id, '')
+        if field in USER_FIELDS:
+            return self.users.nombre(valor_id)
+        return self.values.nombre(valor_id)
+
+    def id_jira(self, field: str, valor_id: Optional[int]) -> Optional[str]:
+        """ID original de Jira de un ID internado (el ID de estado, accountId o ID de opción)"""
+        if valor_id is None:
+            return None
+        if field == 'status':
+            # Los IDs negativos son sintéticos (estado sin ID numérico en el changelog)
+            return str(valor_id) if valor_id >= 0 else None
+        if field in USER_FIELDS:
+            return self.users.id_jira(valor_id)
+        return self.values.id_jira(valor_id)
+
+    def compilar_hitos(self, definiciones: List[Dict]) -> List[HitoCompilado]:
+        """Resuelve las definiciones de hitos contra los catálogos (se reutilizan entre issues)"""
+        firma = tuple((d['columna'], d['campo'], d['regla'], tuple(d['_valores']), d['ocurrencia'])
+                      for d in definiciones)
+        compilados = self._compilados.get(firma)
+        if compilados is None:
+            compilados = []
+            for definicion in definiciones:
+                field = definicion['campo']
+                with self.lock:
+                    field_id = self.fields.intern(field)
+                compilados.append(HitoCompilado(
+                    definicion, field_id,
+                    lambda valor_id, field=field: self.nombre_valor(field, valor_id)))
+            self._compilados[firma] = compilados
+        return compilados
+
+    def hitos_de_eventos(self, issue_key: str, eventos: List[ChangelogEvent],
+                         definiciones: List[Dict]) -> Dict[str, Optional[Dict]]:
+        """
+        Evalúa los hitos sobre eventos ya ordenados en un solo recorrido comparando IDs.
+
+        Returns:
+            Diccionario columna -> {'issue_key', 'value', 'date', 'author', 'from'} o None
+        """
+        if not eventos:
+            return {d['columna']: None for d in definiciones}
+        encontrados = evaluar_eventos(eventos, self.compilar_hitos(definiciones))
+
+        resultados = {}
+        for definicion in definiciones:
+            columna = definicion['columna']
+            evento = encontrados.get(columna)
+            if evento is None:
+                resultados[columna] = None
+            else:
+                resultados[columna] = {
+                    'issue_key': issue_key,
+                    'value': self.nombre_valor(definicion['campo'], evento.to_id),
+                    'date': _formatear_fecha_jira(evento.epoch_ms, evento.tz_min),
+                    'author': self.users.nombre(evento.author_id),
+                    'from': self.nombre_valor(definicion['campo'], evento.from_id)
+                }
+        return resultados
+
+    def ultimo_estado(self, eventos: List[ChangelogEvent]) -> Optional[str]:
+        """Estado actual según el último cambio de status de los eventos (None si no hay)"""
+        with self.lock:
+            field_id = self.fields.intern('status')
+        for evento in reversed(eventos):
+            if evento.field_id == field_id and evento.to_id is not None:
+                return self.nombre_valor('status', evento.to_id) or None
+        return None
+
+
+class JiraIntegration:
+    def __init__(self, http_mode: Optional[str] = None, cassette_path: Optional[str] = None):
+        """
+        Args:
+            http_mode: 'live', 'record' o 'replay' (por defecto JIRA_HTTP_MODE en config.py o entorno)
+            cassette_path: Cassette de grabación/reproducción (por defecto JIRA_CASSETTE o jira_cassette.jsonl.gz)
+        """
         # Try to load from config.py first (tiene prioridad)
         self.api_token = None
         self.server = None
@@ -28,6 +438,8 @@ class JiraIntegration:
             self.api_token = config_data.get('api_token')
             self.server = config_data.get('server')
             self.email = config_data.get('email')
+            http_mode = http_mode or getattr(config, 'JIRA_HTTP_MODE', None)
+            cassette_path = cassette_path or getattr(config, 'JIRA_CASSETTE', None)
         except ImportError:
             pass
         
@@ -37,25 +449,94 @@ class JiraIntegration:
             self.server = self.server or os.getenv('JIRA_SERVER')
             self.email = self.email or os.getenv('JIRA_EMAIL')
         
-        if not all([self.api_token, self.server, self.email]):
+        self.http_mode = (http_mode or os.getenv('JIRA_HTTP_MODE') or 'live').lower()
+        if self.http_mode not in HTTP_MODES:
+            raise ValueError(f"JIRA_HTTP_MODE inválido: {self.http_mode} (usar {HTTP_MODES})")
+        self._cassette = None
+        if self.http_mode != 'live':
+            self._cassette = _Cassette(cassette_path or os.getenv('JIRA_CASSETTE') or CASSETTE_PATH_DEFAULT)
+            print(f"[*] Modo HTTP '{self.http_mode}' con cassette: {self._cassette.ruta}")
+        
+        # En modo replay no se necesitan credenciales (no hay red)
+        if self.http_mode == 'replay':
+            self.server = self.server or 'https://replay.invalid'
+        elif not all([self.api_token, self.server, self.email]):
             raise ValueError(
                 "Missing required configuration. Please set JIRA_API_TOKEN, JIRA_SERVER, and JIRA_EMAIL "
                 "in your .env file or create a config.py file from config.example.py"
             )
         
+        # Caché de changelog (deduplicación de descargas por clave)
+        cache_size, cache_ttl = CHANGELOG_CACHE_SIZE_DEFAULT, CHANGELOG_CACHE_TTL_DEFAULT
+        try:
+            import config
+            cache_size = getattr(config, 'CHANGELOG_CACHE_SIZE', cache_size)
+            cache_ttl = getattr(config, 'CHANGELOG_CACHE_TTL', cache_ttl)
+        except ImportError:
+            pass
+        self._changelog_cache = _ChangelogCache(max_entries=cache_size, ttl=cache_ttl)
+        
+        # Catálogos de internado compartidos por todos los eventos de changelog
+        self.catalogo = CatalogoChangelog()
+        self._status_catalog_loaded = False
+        self._catalog_lock = threading.Lock()
+        
+        # Archivo de changelogs crudos para recalcular hitos sin Jira (no se escribe en modo replay)
+        ruta_archivo = obtener_ruta_archivo()
+        self._archivo = ArchivoChangelog(ruta_archivo) if ruta_archivo and self.http_mode != 'replay' else None
+        
         # Asegurar que el servidor no tenga barra final
         self.server = self.server.rstrip('/')
         
         # Detectar tipo de Jira (Cloud vs Server/Data Center)
-        self.jira_type = self._detect_jira_type()
-        
-        # Initialize Jira connection
-        # Dejar que la biblioteca jira use la versión por defecto (v2)
-        # Jira Cloud soporta v3, pero Server/Data Center solo v2
-        self.jira = JIRA(
-            server=self.server,
-            basic_auth=(self.email, self.api_token)
-        )
+        if self.http_mode == 'replay':
+            self.jira_type = self._cassette.leer_meta('jira_type') or self._detect_jira_type()
+        else:
+            self.jira_type = self._detect_jira_type()
+            if self.http_mode == 'record':
+                self._cassette.grabar_meta('jira_type', self.jira_type)
+        
+        # La conexión de la biblioteca jira se crea al primer uso (ver propiedad jira)
+        self._jira = None
+    
+    @property
+    def jira(self) -> JIRA:
+        """Conexión de la biblioteca jira (no disponible en modo replay)"""
+        if self._jira is None:
+            if self.http_mode == 'replay':
+                raise RuntimeError("La biblioteca jira no está disponible en modo replay")
+            # Initialize Jira connection
+            # Dejar que la biblioteca jira use la versión por defecto (v2)
+            # Jira Cloud soporta v3, pero Server/Data Center solo v2
+            self._jira = JIRA(
+                server=self.server,
+                basic_auth=(self.email, self.api_token)
+            )
+        return self._jira
+    
+    def _http(self, method: str, url: str, **kwargs):
+        """
+        Punto único de acceso REST: en modo 'record' graba cada respuesta en el cassette
+        y en modo 'replay' la sirve desde el cassette sin usar la red.
+        """
+        ruta = url[len(self.server):] if url.startswith(self.server) else url
+        if self.http_mode == 'replay':
+            return self._cassette.reproducir(method, ruta, kwargs.get('json'))
+        response = requests.request(method, url, auth=HTTPBasicAuth(self.email, self.api_token), **kwargs)
+        if self.http_mode == 'record':
+            self._cassette.grabar(method, ruta, kwargs.get('json'), response)
+        return response
+    
+    def _now(self, tz) -> datetime:
+        """Hora actual; se graba/reproduce con el cassette para que las consultas JQL coincidan"""
+        if self.http_mode == 'replay':
+            grabada = self._cassette.leer_meta('now')
+            if grabada:
+                return datetime.fromisoformat(grabada).astimezone(tz)
+        ahora = datetime.now(tz)
+        if self.http_mode == 'record':
+            self._cassette.grabar_meta('now', ahora.isoformat())
+        return ahora
     
     def _detect_jira_type(self) -> str:
         """
@@ -69,10 +550,9 @@ class JiraIntegration:
         # Intentar obtener serverInfo para detectar el tipo
         try:
             url = f"{self.server}/rest/api/2/serverInfo"
-            auth = HTTPBasicAuth(self.email, self.api_token)
             headers = {'Accept': 'application/json'}
             
-            response = requests.get(url, auth=auth, headers=headers, timeout=10)
+            response = self._http('GET', url, headers=headers, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 deployment_type = data.get('deploymentType', '').lower()
@@ -120,7 +600,6 @@ class JiraIntegration:
         # El endpoint /rest/api/3/search/jql requiere un formato específico
         url = f"{self.server}/rest/api/3/search/jql"
             
-        auth = HTTPBasicAuth(self.email, self.api_token)
         headers = {
             'Accept': 'application/json',
             'Content-Type': 'application/json'
@@ -150,7 +629,7 @@ class JiraIntegration:
                 payload['nextPageToken'] = next_page_token
             
             try:
-                response = requests.post(url, json=payload, auth=auth, headers=headers)
+                response = self._http('POST', url, json=payload, headers=headers)
                 response.raise_for_status()
                 
                 data = response.json()
@@ -212,9 +691,308 @@ class JiraIntegration:
             return all_issues[:max_results]
         return all_issues
     
+    def _get_user_timezone(self):
+        """
+        Zona horaria del perfil del usuario: Jira interpreta las fechas absolutas de JQL en ella.
+        Returns: tzinfo (UTC si no se puede obtener)
+        """
+        try:
+            from zoneinfo import ZoneInfo
+            url = f"{self.server}/rest/api/2/myself"
+            headers = {'Accept': 'application/json'}
+            
+            response = self._http('GET', url, headers=headers, timeout=10)
+            response.raise_for_status()
+            time_zone = response.json().get('timeZone')
+            if time_zone:
+                return ZoneInfo(time_zone)
+        except Exception as e:
+            print(f"[DEBUG] No se pudo obtener la zona horaria del usuario: {type(e).__name__}")
+        return timezone.utc
+    
+    def search_issue_keys(self, jql_query: str, max_results: Optional[int] = None) -> List[Dict]:
+        """
+        Busca issues con JQL y retorna solo claves y metadatos básicos (sin descargar cada issue).
+        
+        Args:
+            jql_query: Consulta JQL
+            max_results: Número máximo de resultados (None para obtener todos)
+            
+        Returns:
+            Lista de diccionarios {'key', 'created', 'updated', 'status'} en el orden de la consulta
+            
+        Raises:
+            requests.exceptions.RequestException: Si falla alguna página de la búsqueda
+        """
+        url = f"{self.server}/rest/api/3/search/jql"
+        headers = {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json'
+        }
+        
+        resultados = []
+        next_page_token = None
+        while max_results is None or len(resultados) < max_results:
+            payload = {
+                'jql': jql_query,
+                'maxResults': 100,
+                'fields': ['created', 'updated', 'status']
+            }
+            if max_results is not None:
+                payload['maxResults'] = min(100, max_results - len(resultados))
+            if next_page_token:
+                payload['nextPageToken'] = next_page_token
+            
+            try:
+                response = self._http('POST', url, json=payload, headers=headers, timeout=60)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                print(f"Error en búsqueda JQL: {e}")
+                if hasattr(e, 'response') and e.response is not None:
+                    print(f"Response: {e.response.text}")
+                raise
+            
+            data = response.json()
+            for issue_data in data.get('issues', []):
+                fields = issue_data.get('fields') or {}
+                resultados.append({
+                    'key': issue_data.get('key') or issue_data.get('id'),
+                    'created': fields.get('created'),
+                    'updated': fields.get('updated'),
+                    'status': (fields.get('status') or {}).get('name')
+                })
+            
+            next_page_token = data.get('nextPageToken')
+            if data.get('isLast', False) or not next_page_token or not data.get('issues'):
+                break
+        
+        if max_results is not None:
+            return resultados[:max_results]
+        return resultados
+    
+    def search_issue_keys_sliced(self, jql_filter: str, horas: int = 720, slices: int = 30,
+                                 max_workers: int = 8, max_results: Optional[int] = None) -> List[Dict]:
+        """
+        Descubre las claves de los issues creados en las últimas `horas` dividiendo la ventana
+        en `slices` rangos disjuntos de 'created' que se paginan en paralelo.
+        El resultado conserva el orden 'created DESC' y no tiene claves duplicadas.
+        
+        Args:
+            jql_filter: Condiciones JQL sin ventana de fechas ni ORDER BY
+                (ej: 'project = TPGSOC AND assignee IN membersOf("RSOC ILATAM L1")')
+            horas: Tamaño de la ventana (equivalente a 'created >= -{horas}h')
+            slices: Número de sub-rangos (ej: 30 = uno por día en 720h)
+            max_workers: Búsquedas simultáneas
+            max_results: Número máximo de resultados (None para obtener todos)
+            
+        Returns:
+            Lista de diccionarios {'key', 'created', 'updated', 'status'}
+        """
+        # Límites absolutos (precisión de minuto, en la zona horaria del usuario) para que
+        # los rangos no se desplacen entre búsquedas ejecutadas en momentos distintos
+        tz = self._get_user_timezone()
+        ahora = self._now(tz).replace(second=0, microsecond=0)
+        inicio = ahora - timedelta(hours=horas)
+        paso = (ahora - inicio) / max(1, slices)
+        limites = [inicio + paso * i for i in range(max(1, slices))] + [None]
+        
+        def formatear(fecha):
+            return fecha.strftime('"%Y/%m/%d %H:%M"')
+        
+        # Del rango más reciente al más antiguo, para concatenar en orden created DESC
+        consultas = []
+        for desde, hasta in reversed(list(zip(limites[:-1], limites[1:]))):
+            jql = f"({jql_filter}) AND created >= {formatear(desde)}"
+            if hasta is not None:
+                jql += f" AND created < {formatear(hasta)}"
+            consultas.append(jql + " ORDER BY created DESC")
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            por_rango = list(executor.map(lambda jql: self.search_issue_keys(jql, max_results), consultas))
+        
+        resultados = []
+        vistos = set()
+        for rango in por_rango:
+            for issue in rango:
+                if issue['key'] and issue['key'] not in vistos:
+                    vistos.add(issue['key'])
+                    resultados.append(issue)
+        
+        if max_results is not None:
+            return resultados[:max_results]
+        return resultados
+    
+    def _predicado_jql(self, definicion: Dict) -> Optional[str]:
+        """
+        Predicado JQL que debe cumplir un issue para poder tener el hito.
+        
+        Returns:
+            - El campo 'jql' de la definición si existe
+            - Para hitos de status: '(status CHANGED TO "a" OR status CHANGED TO "b")' con los nombres
+              exactos del catálogo que cumplen la regla (CHANGED TO admite un solo valor; '' si
+              ningún estado la cumple)
+            - None si el hito no se puede podar (ej: assignee con coincidencia parcial de nombres)
+        """
+        if definicion.get('jql'):
+            return f"({definicion['jql']})"
+        if definicion['campo'] != 'status':
+            return None
+        self.load_catalogs()
+        if not self.catalogo.status_names:
+            return None
+        nombres = sorted({n for n in self.catalogo.status_names.values() if coincide(definicion, n)})
+        if not nombres:
+            return ''
+        clausulas = ['status CHANGED TO "' + n.replace('\\', '\\\\').replace('"', '\\"') + '"' for n in nombres]
+        return f"({' OR '.join(clausulas)})"
+    
+    def milestones_without_pruning(self, definiciones: List[Dict]) -> List[str]:
+        """
+        Columnas de los hitos que no se pueden podar por JQL (ver _predicado_jql). Si hay alguna,
+        todo issue necesita su changelog y la poda no evitaría ninguna descarga.
+        """
+        return [d['columna'] for d in definiciones if self._predicado_jql(d) is None]
+    
+    def build_milestone_membership(self, issue_keys: List[str], definiciones: List[Dict],
+                                   batch_size: int = PODA_LOTE_DEFAULT, max_workers: int = 8) -> Dict[str, set]:
+        """
+        Pre-paso de poda: unas pocas búsquedas JQL (solo claves) por hito para saber qué issues
+        pueden tenerlo, sin descargar changelogs. Solo sirve para decidir qué changelogs descargar:
+        un issue sin ningún hito posible se omite. Si algún hito no se puede podar no se hace
+        ninguna búsqueda (ningún issue podría omitirse).
+        
+        Args:
+            issue_keys: Claves a evaluar (se consultan en lotes con issuekey IN (...))
+            definiciones: Definiciones de hitos normalizadas
+            batch_size: Claves por búsqueda
+            max_workers: Búsquedas simultáneas
+            
+        Returns:
+            Diccionario columna -> conjunto de claves que pueden tener el hito, con todos los hitos;
+            vacío si alguno no se puede podar. Si un lote falla (ej: una clave ya no existe o Jira rechaza el
+            predicado), sus claves se incluyen en el conjunto para no descartar nada por error
+            y se informa cuántos lotes de cada hito quedaron sin poda.
+        """
+        predicados = {d['columna']: self._predicado_jql(d) for d in definiciones}
+        if not predicados or any(predicado is None for predicado in predicados.values()):
+            return {}
+        
+        membresia = {columna: set() for columna in predicados}
+        claves = list(dict.fromkeys(k for k in issue_keys if k))
+        lotes = [claves[i:i + batch_size] for i in range(0, len(claves), max(1, batch_size))]
+        tareas = [(columna, predicado, lote) for columna, predicado in predicados.items() if predicado
+                  for lote in lotes]
+        
+        def buscar(tarea):
+            columna, predicado, lote = tarea
+            jql = f"issuekey IN ({', '.join(lote)}) AND {predicado}"
+            try:
+                return columna, {issue['key'] for issue in self.search_issue_keys(jql)}, None
+            except Exception as e:
+                return columna, set(lote), f"{type(e).__name__}: {str(e)[:200]}"
+        
+        fallos = {}  # columna -> (lotes fallidos, último error)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for columna, encontradas, error in executor.map(buscar, tareas):
+                membresia[columna] |= encontradas
+                if error:
+                    fallos[columna] = (fallos.get(columna, (0, None))[0] + 1, error)
+        for columna, (cantidad, error) in fallos.items():
+            print(f"[!] Poda JQL sin efecto en {cantidad}/{len(lotes)} lote(s) de '{columna}' "
+                  f"(se revisan sin poda): {error}")
+            print(f"    Predicado: {predicados[columna]}")
+        return membresia
+    
+    def load_catalogs(self):
+        """
+        Carga una sola vez el catálogo de estados (/rest/api/2/status: ID -> nombre) y lo guarda
+        junto al archivo de changelogs para las rutas sin Jira (webhooks, recálculo).
+        El catálogo de usuarios se construye internando los usuarios que aparecen en los changelogs.
+        """
+        with self._catalog_lock:
+            if self._status_catalog_loaded:
+                return
+            self._status_catalog_loaded = True
+            try:
+                url = f"{self.server}/rest/api/2/status"
+                headers = {'Accept': 'application/json'}
+                
+                response = self._http('GET', url, headers=headers, timeout=30)
+                response.raise_for_status()
+                estados = {}
+                for status in response.json():
+                    try:
+                        estados[int(status['id'])] = status.get('name', '')
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                self.catalogo.registrar_estados(estados)
+            except Exception as e:
+                print(f"[DEBUG] No se pudo cargar el catálogo de estados: {type(e).__name__}")
+                return
+            if self._archivo is not None and estados:
+                try:
+                    self._archivo.guardar_estados(estados)
+                except Exception as e:
+                    print(f"[DEBUG] No se pudo guardar el catálogo de estados: {type(e).__name__}")
+    
+    def get_changelog_events(self, issue_key: str) -> List[ChangelogEvent]:
+        """
+        Obtiene el changelog de un issue como eventos compactos (ordenados del más antiguo al más nuevo).
+        Las llamadas repetidas o concurrentes para la misma clave comparten una sola descarga
+        (caché LRU con TTL, ver CHANGELOG_CACHE_SIZE / CHANGELOG_CACHE_TTL en config.py).
+        
+        Args:
+            issue_key: La clave del issue (ej: TPGSOC-1329200)
+            
+        Returns:
+            Lista de ChangelogEvent (compartida con la caché, no modificar)
+        """
+        return self._changelog_cache.get_or_fetch(
+            issue_key, lambda key: self.catalogo.compactar(self._fetch_changelog(key)))
+    
     def get_changelog(self, issue_key: str) -> List[Dict]:
         """
         Obtiene el historial completo (changelog) de un issue.
+        Se construye desde los eventos compactos en caché (ver get_changelog_events).
+        
+        Args:
+            issue_key: La clave del issue (ej: TPGSOC-1329200)
+            
+        Returns:
+            Lista de diccionarios con los cambios realizados
+        """
+        changelog = []
+        for evento in self.get_changelog_events(issue_key):
+            field = self.catalogo.fields.nombre(evento.field_id)
+            # Los eventos guardan IDs internados; se devuelven los IDs originales de Jira
+            changelog.append({
+                'issue_key': issue_key,
+                'date': _formatear_fecha_jira(evento.epoch_ms, evento.tz_min),
+                'author': self.catalogo.users.nombre(evento.author_id),
+                'field': field,
+                'from': self.catalogo.nombre_valor(field.lower(), evento.from_id),
+                'to': self.catalogo.nombre_valor(field.lower(), evento.to_id),
+                'from_id': self.catalogo.id_jira(field.lower(), evento.from_id),
+                'to_id': self.catalogo.id_jira(field.lower(), evento.to_id)
+            })
+        return changelog
+    
+    def clear_changelog_cache(self, issue_key: Optional[str] = None):
+        """Invalida la caché de changelog de un issue (o de todos si issue_key es None)"""
+        self._changelog_cache.invalidate(issue_key)
+    
+    def _archivar(self, issue_key: str, histories: List[Dict], fuente: str):
+        """Guarda las historias crudas en el archivo de changelogs (errores no interrumpen la descarga)"""
+        if self._archivo is None:
+            return
+        try:
+            self._archivo.guardar(issue_key, histories, fuente)
+        except Exception as e:
+            print(f"[DEBUG] No se pudo archivar el changelog de {issue_key}: {type(e).__name__}")
+    
+    def _fetch_changelog(self, issue_key: str) -> List[Dict]:
+        """
+        Descarga el historial completo (changelog) de un issue desde Jira.
         Implementa múltiples fallbacks según la documentación oficial:
         1. API v2 directa con ?expand=changelog (método preferido - más compatible)
         2. Biblioteca jira con expand='changelog' (fallback)
@@ -224,40 +1002,32 @@ class JiraIntegration:
             issue_key: La clave del issue (ej: TPGSOC-1329200)
             
         Returns:
-            Lista de diccionarios con los cambios realizados
+            Lista de diccionarios con los cambios realizados (vacía si Jira respondió sin cambios)
+            
+        Raises:
+            ChangelogNoDisponible: Si ningún método obtuvo una respuesta válida; así los llamadores
+                no confunden un fallo con un issue sin historial (y no borran hitos ya guardados)
         """
         changelog = []
+        # Alguna respuesta válida de Jira (aunque sin cambios): un changelog vacío es real
+        respuesta_valida = False
         
         # Método 1: API v2 directa con ?expand=changelog (MÁS COMPATIBLE - empezar aquí)
         # Este es el método más confiable según la documentación - funciona en Server y Cloud
         try:
             url = f"{self.server}/rest/api/2/issue/{issue_key}?expand=changelog"
-            auth = HTTPBasicAuth(self.email, self.api_token)
             headers = {'Accept': 'application/json'}
             
-            response = requests.get(url, auth=auth, headers=headers, timeout=30)
+            response = self._http('GET', url, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
+            respuesta_valida = True
             
             if 'changelog' in data and 'histories' in data['changelog']:
-                for history in data['changelog']['histories']:
-                    created = history.get('created', '')
-                    author = history.get('author', {})
-                    author_name = author.get('displayName', '') if author else ''
-                    
-                    for item in history.get('items', []):
-                        changelog.append({
-                            'issue_key': issue_key,
-                            'date': created,
-                            'author': author_name,
-                            'field': item.get('field', ''),
-                            'from': item.get('fromString', ''),
-                            'to': item.get('toString', ''),
-                            'from_id': item.get('from', None),
-                            'to_id': item.get('to', None)
-                        })
+                changelog = changelog_desde_historias(issue_key, data['changelog']['histories'])
                 
                 if changelog:
+                    self._archivar(issue_key, data['changelog']['histories'], 'api2')
                     return changelog
         except requests.exceptions.HTTPError as e:
             # Log del error HTTP para debugging
@@ -272,76 +1042,100 @@ class JiraIntegration:
         
         # Método 2: Biblioteca jira con expand='changelog' (fallback)
         # Nota: La biblioteca jira puede intentar usar v3, por eso es fallback
-        try:
-            issue = self.jira.issue(issue_key, expand='changelog')
-            
-            # Verificar que el changelog existe
-            if hasattr(issue, 'changelog') and issue.changelog:
-                for history in issue.changelog.histories:
-                    created = history.created
-                    author = history.author
-                    author_name = author.displayName if hasattr(author, 'displayName') else str(author)
-                    
-                    for item in history.items:
-                        changelog.append({
-                            'issue_key': issue_key,
-                            'date': created,
-                            'author': author_name,
-                            'field': item.field,
-                            'from': item.fromString if hasattr(item, 'fromString') else '',
-                            'to': item.toString if hasattr(item, 'toString') else '',
-                            'from_id': getattr(item, 'from', None),
-                            'to_id': getattr(item, 'to', None)
-                        })
-            
-            if changelog:
-                return changelog
-        except Exception as e:
-            # Log del error para debugging
-            print(f"[DEBUG] Método 2 (biblioteca jira) falló para {issue_key}: {type(e).__name__}: {str(e)[:100]}")
+        # (no pasa por _http, así que no se graba ni se usa en modo replay)
+        if self.http_mode != 'replay':
+            try:
+                issue = self.jira.issue(issue_key, expand='changelog')
+                respuesta_valida = True
+                
+                # Verificar que el changelog existe
+                if hasattr(issue, 'changelog') and issue.changelog:
+                    for history in issue.changelog.histories:
+                        created = history.created
+                        author = history.author
+                        author_name = author.displayName if hasattr(author, 'displayName') else str(author)
+                        author_id = getattr(author, 'accountId', None) or getattr(author, 'name', None)
+                        
+                        for item in history.items:
+                            changelog.append({
+                                'issue_key': issue_key,
+                                'date': created,
+                                'author': author_name,
+                                'author_id': author_id or author_name,
+                                'field': item.field,
+                                'from': item.fromString if hasattr(item, 'fromString') else '',
+                                'to': item.toString if hasattr(item, 'toString') else '',
+                                'from_id': getattr(item, 'from', None),
+                                'to_id': getattr(item, 'to', None)
+                            })
+                
+                if changelog:
+                    self._archivar(issue_key, [getattr(h, 'raw', None) or {} for h in issue.changelog.histories],
+                                   'biblioteca')
+                    return changelog
+            except Exception as e:
+                # Log del error para debugging
+                print(f"[DEBUG] Método 2 (biblioteca jira) falló para {issue_key}: {type(e).__name__}: {str(e)[:100]}")
         
         # Método 3: API v3 directa con endpoint /changelog (solo Cloud, último recurso)
         if self.jira_type == 'cloud':
             try:
                 # En API v3, el endpoint correcto es /rest/api/3/issue/{key}/changelog
                 url = f"{self.server}/rest/api/3/issue/{issue_key}/changelog"
-                auth = HTTPBasicAuth(self.email, self.api_token)
                 headers = {'Accept': 'application/json'}
                 
-                response = requests.get(url, auth=auth, headers=headers, timeout=30)
+                response = self._http('GET', url, headers=headers, timeout=30)
                 response.raise_for_status()
                 data = response.json()
+                respuesta_valida = True
                 
                 if 'values' in data:  # API v3 usa 'values' en lugar de 'histories'
-                    for history in data['values']:
-                        created = history.get('created', '')
-                        author = history.get('author', {})
-                        author_name = author.get('displayName', '') if author else ''
-                        
-                        for item in history.get('items', []):
-                            changelog.append({
-                                'issue_key': issue_key,
-                                'date': created,
-                                'author': author_name,
-                                'field': item.get('field', ''),
-                                'from': item.get('fromString', ''),
-                                'to': item.get('toString', ''),
-                                'from_id': item.get('from', None),
-                                'to_id': item.get('to', None)
-                            })
+                    changelog = changelog_desde_historias(issue_key, data['values'])
                 
                 if changelog:
+                    self._archivar(issue_key, data['values'], 'api3')
                     return changelog
             except Exception as e:
                 # Log del error para debugging
                 print(f"[DEBUG] Método 3 (API v3) falló para {issue_key}: {type(e).__name__}: {str(e)[:100]}")
         
-        # Si ningún método funcionó, loguear advertencia
-        if not changelog:
-            print(f"[DEBUG] Todos los métodos fallaron para {issue_key}, changelog vacío")
+        # Si ningún método funcionó, es un fallo (no un changelog vacío)
+        if not changelog and not respuesta_valida:
+            print(f"[DEBUG] Todos los métodos fallaron para {issue_key}")
+            raise ChangelogNoDisponible(f"No se pudo descargar el changelog de {issue_key}")
         
         return changelog
     
+    def get_milestone_dates(self, issue_key: str, definiciones: List[Dict]) -> Dict[str, Optional[Dict]]:
+        """
+        Obtiene todos los hitos configurados de un issue con una sola descarga del changelog
+        y un solo recorrido del mismo.
+        
+        Args:
+            issue_key: La clave del issue (ej: TPGSOC-1329200)
+            definiciones: Definiciones de hitos normalizadas (ver hitos.cargar_definiciones_hitos)
+            
+        Returns:
+            Diccionario columna -> {'issue_key', 'value', 'date', 'author', 'from'} o None
+            
+        Raises:
+            ChangelogNoDisponible: Si no se pudo descargar el changelog
+        """
+        # Catálogo de estados actual antes de compilar (la coincidencia usa los nombres vigentes)
+        self.load_catalogs()
+        eventos = self.get_changelog_events(issue_key)
+        # Si el changelog está vacío, puede ser un problema de permisos o el issue no tiene historial;
+        # los eventos ya están ordenados del más antiguo al más nuevo: un solo recorrido comparando IDs
+        return self.catalogo.hitos_de_eventos(issue_key, eventos, definiciones)
+    
+    def get_current_status(self, issue_key: str) -> Optional[str]:
+        """
+        Estado actual de un issue según el último cambio de status de su changelog
+        (usa los eventos en caché; None si el changelog no tiene cambios de status)
+        """
+        self.load_catalogs()
+        return self.catalogo.ultimo_estado(self.get_changelog_events(issue_key))
+    
     def get_status_change_date(self, issue_key: str, target_status: str = "with RSOC") -> Optional[Dict]:
         """
         Obtiene la fecha exacta en que un caso cambió a un estado específico.
@@ -354,28 +1148,18 @@ class JiraIntegration:
         Returns:
             Diccionario con información del cambio o None si no se encontró
         """
-        changelog = self.get_changelog(issue_key)
-        
-        if not changelog:
-            # Si el changelog está vacío, puede ser un problema de permisos o el issue no tiene historial
+        definicion = validar_definicion({'columna': target_status, 'campo': 'status',
+                                         'regla': 'contiene', 'valor': target_status})
+        result = self.get_milestone_dates(issue_key, [definicion])[target_status]
+        if not result:
             return None
-        
-        # Ordenar changelog por fecha (del más antiguo al más nuevo) para asegurar que tomamos el PRIMER cambio
-        # Convertir fechas a objetos datetime para comparar correctamente
-        changelog_sorted = sorted(changelog, key=lambda x: x['date'] if x['date'] else datetime.min)
-        
-        # Buscar el cambio de estado
-        for change in changelog_sorted:
-            if change['field'].lower() == 'status' and change['to'] and target_status.lower() in change['to'].lower():
-                return {
-                    'issue_key': issue_key,
-                    'status': change['to'],
-                    'date': change['date'],
-                    'author': change['author'],
-                    'from_status': change['from']
-                }
-        
-        return None
+        return {
+            'issue_key': issue_key,
+            'status': result['value'],
+            'date': result['date'],
+            'author': result['author'],
+            'from_status': result['from']
+        }
     
     def get_assignee_change_date(self, issue_key: str, target_assignees: List[str]) -> Optional[Dict]:
         """
@@ -389,30 +1173,18 @@ class JiraIntegration:
         Returns:
             Diccionario con información del cambio o None si no se encontró
         """
-        changelog = self.get_changelog(issue_key)
-        
-        # Ordenar changelog por fecha (del más antiguo al más nuevo) para asegurar que tomamos el PRIMER cambio
-        # Convertir fechas a objetos datetime para comparar correctamente
-        changelog_sorted = sorted(changelog, key=lambda x: x['date'] if x['date'] else datetime.min)
-        
-        # Normalizar nombres para comparación (remover acentos, mayúsculas)
-        target_assignees_lower = [name.lower().strip() for name in target_assignees]
-        
-        for change in changelog_sorted:
-            if change['field'].lower() == 'assignee' and change['to']:
-                assignee_name = change['to'].lower().strip()
-                # Verificar si el nombre asignado coincide con alguno de la lista
-                for target in target_assignees_lower:
-                    if target in assignee_name or assignee_name in target:
-                        return {
-                            'issue_key': issue_key,
-                            'assignee': change['to'],
-                            'date': change['date'],
-                            'author': change['author'],
-                            'from_assignee': change['from']
-                        }
-        
-        return None
+        definicion = validar_definicion({'columna': 'assignee', 'campo': 'assignee',
+                                         'regla': 'en_lista', 'valor': target_assignees})
+        result = self.get_milestone_dates(issue_key, [definicion])['assignee']
+        if not result:
+            return None
+        return {
+            'issue_key': issue_key,
+            'assignee': result['value'],
+            'date': result['date'],
+            'author': result['author'],
+            'from_assignee': result['from']
+        }
     
     def get_rsoc_date_batch(self, issue_keys: List[str]) -> List[Dict]:
         """
@@ -426,7 +1198,12 @@ class JiraIntegration:
         """
         results = []
         for issue_key in issue_keys:
-            result = self.get_status_change_date(issue_key, "with RSOC")
+            try:
+                result = self.get_status_change_date(issue_key, "with RSOC")
+            except ChangelogNoDisponible:
+                results.append({'issue_key': issue_key, 'status': None, 'date': None, 'author': None,
+                                'from_status': None, 'note': 'No se pudo descargar el changelog'})
+                continue
             if result:
                 results.append(result)
             else:
@@ -3,22 +3,49 @@ Script para obtener issues desde Jira usando JQL y actualizar Libro1.xlsx
 Ejecuta una consulta JQL y llena la columna Clave en Libro1.xlsx
 """
 from jira_integration import JiraIntegration
+from almacen import AlmacenIssues
+from cola_trabajo import ColaTrabajo
+from planificador import prioridad_cola
+from hitos import cargar_definiciones_hitos, definicion_cierre
+import perfilado
 import os
 from openpyxl import load_workbook, Workbook
 from datetime import datetime, timezone
 
-def obtener_issues_y_actualizar_xlsx(archivo_xlsx='Libro1.xlsx', max_results=None):
+# Filtro de la consulta (sin ventana de fechas) y tamaño de la ventana en horas (720h = 30 días)
+JQL_FILTRO = 'project = TPGSOC AND assignee IN membersOf("RSOC ILATAM L1")'
+VENTANA_HORAS = 720
+
+# Descubrimiento en paralelo: sub-rangos de 'created' (uno por día) y búsquedas simultáneas
+JQL_SLICES_DEFAULT = 30
+JQL_WORKERS_DEFAULT = 8
+
+
+def cargar_config_busqueda():
+    """Número de sub-rangos y de búsquedas simultáneas desde config.py (JQL_SLICES, JQL_WORKERS)"""
+    slices, workers = JQL_SLICES_DEFAULT, JQL_WORKERS_DEFAULT
+    try:
+        import config
+        slices = getattr(config, 'JQL_SLICES', slices)
+        workers = getattr(config, 'JQL_WORKERS', workers)
+    except ImportError:
+        pass
+    return slices, workers
+
+def obtener_issues_y_actualizar_xlsx(archivo_xlsx='Libro1.xlsx', max_results=None, encolar=False):
     """
     Obtiene issues desde Jira usando JQL y actualiza Libro1.xlsx con las claves
     
     Args:
         archivo_xlsx: Nombre del archivo XLSX a actualizar
         max_results: Número máximo de resultados a obtener (None para todos)
+        encolar: Agregar las claves a la cola de trabajo durable (procesar_csv.py --trabajador)
     """
     
     # Consulta JQL usando horas (-720h = 30 días)
     # Usamos horas en lugar de días para mayor precisión y consistencia
-    jql_query = 'created >= -720h AND project = TPGSOC AND assignee IN membersOf("RSOC ILATAM L1") ORDER BY created DESC'
+    jql_query = f'created >= -{VENTANA_HORAS}h AND {JQL_FILTRO} ORDER BY created DESC'
+    slices, workers = cargar_config_busqueda()
     
     print("=" * 80)
     print("Obteniendo issues desde Jira")
@@ -27,9 +54,11 @@ def obtener_issues_y_actualizar_xlsx(archivo_xlsx='Libro1.xlsx', max_results=Non
     print(f"\n[*] Fecha actual (UTC): {fecha_actual_utc.strftime('%Y-%m-%d %H:%M:%S')} UTC")
     print(f"[*] Buscando issues desde: hace 720 horas (30 días)")
     print(f"\n[*] Consulta JQL:")
-    print(f"    {jql_query}\n")
+    print(f"    {jql_query}")
+    print(f"    (dividida en {slices} rangos de 'created' consultados en paralelo, {workers} a la vez)\n")
     
     # Inicializar conexión a Jira
+    perfilado.marcar_etapa('Conexión')
     try:
         print("[*] Conectando a Jira...")
         jira = JiraIntegration()
@@ -38,15 +67,18 @@ def obtener_issues_y_actualizar_xlsx(archivo_xlsx='Libro1.xlsx', max_results=Non
         print(f"[ERROR] Error al conectar con Jira: {e}")
         return
     
+    perfilado.marcar_etapa('Búsqueda JQL')
     # Buscar issues - obtener todos los resultados disponibles
     try:
         if max_results and max_results > 0:
             print(f"[*] Buscando issues (máximo {max_results})...")
-            issues = jira.search_issues(jql_query, max_results=max_results)
+            issues = jira.search_issue_keys_sliced(JQL_FILTRO, horas=VENTANA_HORAS, slices=slices,
+                                                   max_workers=workers, max_results=max_results)
         else:
             print(f"[*] Buscando TODOS los issues disponibles...")
             # Pasar None para obtener todos los resultados
-            issues = jira.search_issues(jql_query, max_results=None)
+            issues = jira.search_issue_keys_sliced(JQL_FILTRO, horas=VENTANA_HORAS, slices=slices,
+                                                   max_workers=workers, max_results=None)
         print(f"\n[OK] Se encontraron {len(issues)} issues\n")
     except Exception as e:
         print(f"[ERROR] Error al buscar issues: {e}")
@@ -56,10 +88,17 @@ def obtener_issues_y_actualizar_xlsx(archivo_xlsx='Libro1.xlsx', max_results=Non
         print("[!] No se encontraron issues con los criterios especificados")
         return
     
-    # Extraer claves
+    # Extraer claves (y metadatos para el almacén)
     claves = []
+    registros = []
     for issue in issues:
-        claves.append(issue.key)
+        claves.append(issue['key'])
+        registros.append({
+            'Clave': issue['key'],
+            'creado': issue['created'],
+            'actualizado': issue['updated'],
+            'estado': issue['status']
+        })
     
     print(f"[*] Claves obtenidas: {len(claves)}")
     print(f"\n[*] Primeras 10 claves:")
@@ -68,6 +107,28 @@ def obtener_issues_y_actualizar_xlsx(archivo_xlsx='Libro1.xlsx', max_results=Non
     if len(claves) > 10:
         print(f"    ... y {len(claves) - 10} más")
     
+    perfilado.marcar_etapa('Almacén')
+    # Registrar las claves en el almacén persistente (fuente de verdad)
+    try:
+        with AlmacenIssues() as almacen:
+            almacen.upsert_issues(registros)
+            print(f"\n[OK] {len(registros)} issues registrados en el almacén: {almacen.ruta}")
+    except Exception as e:
+        print(f"\n[!] Error al actualizar el almacén: {e}")
+    
+    if encolar:
+        # Cola de trabajo para trabajadores de enriquecimiento (abiertos y recientes primero)
+        try:
+            # El hito de cierre configurado decide qué estados cuentan como cerrados
+            cierre = definicion_cierre(cargar_definiciones_hitos())
+            with ColaTrabajo() as cola:
+                encoladas = cola.encolar([(r['Clave'], prioridad_cola(r['estado'], r['actualizado'], cierre))
+                                          for r in registros])
+                print(f"[OK] {encoladas} claves encoladas en '{cola.nombre}': {cola.resumen()}")
+        except Exception as e:
+            print(f"[!] Error al encolar las claves: {e}")
+    
+    perfilado.marcar_etapa('Escritura XLSX')
     # PASO 1: Borrar el Excel existente para evitar superposición
     if os.path.exists(archivo_xlsx):
         print(f"\n[*] Eliminando archivo Excel existente: {archivo_xlsx}")
@@ -111,19 +172,23 @@ def obtener_issues_y_actualizar_xlsx(archivo_xlsx='Libro1.xlsx', max_results=Non
         traceback.print_exc()
 
 if __name__ == "__main__":
-    import sys
+    import argparse
     
+    parser = argparse.ArgumentParser(description='Obtiene issues desde Jira usando JQL y actualiza el XLSX')
     # Permitir especificar el archivo XLSX como argumento
-    archivo = sys.argv[1] if len(sys.argv) > 1 else "Libro1.xlsx"
-    
+    parser.add_argument('archivo', nargs='?', default='Libro1.xlsx')
     # Permitir especificar max_results como segundo argumento
     # Si no se especifica o es 0, obtener todos los resultados
-    if len(sys.argv) > 2:
-        max_results = int(sys.argv[2]) if int(sys.argv[2]) > 0 else None
-    else:
-        max_results = None  # Por defecto obtener todos
+    parser.add_argument('max_results', nargs='?', type=int, default=0)
+    parser.add_argument('--encolar', action='store_true',
+                        help='Agregar las claves a la cola de trabajo (procesar_csv.py --trabajador)')
+    perfilado.agregar_argumentos(parser)
+    args = parser.parse_args()
+    perfilado.activar_desde_argumentos(args, JiraIntegration)
     
-    obtener_issues_y_actualizar_xlsx(archivo, max_results)
+    max_results = args.max_results if args.max_results > 0 else None
+    obtener_issues_y_actualizar_xlsx(args.archivo, max_results, encolar=args.encolar)
+    perfilado.terminar_etapa()
     
     print("\n" + "=" * 80)
     print("[OK] Proceso completado")
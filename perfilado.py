@@ -0,0 +1,206 @@
+"""
+Perfilado opcional de las etapas (PASO) y de los métodos de JiraIntegration
+Se activa desde la línea de comandos con --profile (CPU, cProfile) y/o --trace-memory
+(asignaciones, tracemalloc). Sin activar, todas las funciones son no-op.
+Los hilos creados durante una etapa (búsquedas JQL en paralelo, poda, descargas) se perfilan
+con un cProfile propio por hilo y se suman a los hotspots de la etapa.
+
+Uso desde un script:
+    perfilado.activar(cpu=True, memoria=True, reporte='perfil.txt')
+    perfilado.instrumentar(JiraIntegration)
+    perfilado.marcar_etapa('PASO 1')
+    ...
+    perfilado.finalizar()   # también se llama automáticamente al salir
+"""
+import io
+import sys
+import time
+import atexit
+import pstats
+import cProfile
+import functools
+import threading
+import tracemalloc
+from typing import Optional
+
+REPORTE_DEFAULT = 'perfil_report.txt'
+TOP_HOTSPOTS = 25
+
+
+class _Perfilador:
+    def __init__(self, cpu: bool, memoria: bool, reporte: str):
+        self.cpu = cpu
+        self.memoria = memoria
+        self.reporte = reporte
+        self.etapas = []  # (nombre, segundos, pico_bytes, pstats.Stats o None, hilos perfilados)
+        self.metodos = {}  # nombre -> [llamadas, segundos, bytes_netos]
+        # Los métodos instrumentados también se llaman desde hilos de ThreadPoolExecutor
+        self._lock = threading.Lock()
+        self._perfiles_hilos = []
+        self._etapa_actual = None
+        self._finalizado = False
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def iniciar_etapa(self, nombre: str):
+        self.terminar_etapa()
+        perfil = None
+        if self.cpu:
+            perfil = cProfile.Profile()
+            perfil.enable()
+            # cProfile solo instrumenta el hilo que lo activa: cada hilo nuevo activa el suyo
+            threading.setprofile(self._perfilar_hilo)
+        if self.memoria:
+            tracemalloc.reset_peak()
+        self._etapa_actual = (nombre, time.perf_counter(), perfil)
+
+    def _perfilar_hilo(self, frame, event, arg):
+        """Gancho de threading.setprofile: en el primer evento del hilo lo cambia por un cProfile propio"""
+        sys.setprofile(None)
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Python 3.12+: cProfile usa sys.monitoring y el perfil de la etapa ya ve todos los hilos
+            return
+        with self._lock:
+            self._perfiles_hilos.append(perfil)
+
+    def terminar_etapa(self):
+        if self._etapa_actual is None:
+            return
+        nombre, inicio, perfil = self._etapa_actual
+        self._etapa_actual = None
+        segundos = time.perf_counter() - inicio
+        stats = None
+        hilos = 0
+        if perfil is not None:
+            threading.setprofile(None)
+            perfil.disable()
+            stats = pstats.Stats(perfil)
+            with self._lock:
+                perfiles_hilos, self._perfiles_hilos = self._perfiles_hilos, []
+            for perfil_hilo in perfiles_hilos:
+                perfil_hilo.disable()
+                try:
+                    stats.add(perfil_hilo)
+                    hilos += 1
+                except TypeError:
+                    continue  # hilo sin llamadas registradas
+        pico = tracemalloc.get_traced_memory()[1] if self.memoria else None
+        self.etapas.append((nombre, segundos, pico, stats, hilos))
+
+    def medir_metodo(self, nombre: str, func):
+        @functools.wraps(func)
+        def envoltura(*args, **kwargs):
+            memoria_antes = tracemalloc.get_traced_memory()[0] if self.memoria else 0
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                segundos = time.perf_counter() - inicio
+                neto = tracemalloc.get_traced_memory()[0] - memoria_antes if self.memoria else 0
+                with self._lock:
+                    registro = self.metodos.setdefault(nombre, [0, 0.0, 0])
+                    registro[0] += 1
+                    registro[1] += segundos
+                    registro[2] += neto
+        return envoltura
+
+    def escribir_reporte(self):
+        salida = io.StringIO()
+        salida.write("=" * 80 + "\n")
+        salida.write("Reporte de perfilado\n")
+        salida.write("=" * 80 + "\n\n")
+
+        salida.write("[Etapas]\n")
+        salida.write(f"{'Etapa':<40} {'Segundos':>10} {'Pico memoria (MB)':>18}\n")
+        for nombre, segundos, pico, _, _ in self.etapas:
+            pico_mb = f"{pico / 1024 / 1024:.2f}" if pico is not None else '-'
+            salida.write(f"{nombre:<40} {segundos:>10.3f} {pico_mb:>18}\n")
+
+        if self.metodos:
+            salida.write("\n[Métodos instrumentados]\n")
+            salida.write(f"{'Método':<40} {'Llamadas':>10} {'Segundos':>10} {'Memoria neta (MB)':>18}\n")
+            for nombre, (llamadas, segundos, neto) in sorted(self.metodos.items(), key=lambda x: -x[1][1]):
+                neto_mb = f"{neto / 1024 / 1024:.2f}" if self.memoria else '-'
+                salida.write(f"{nombre:<40} {llamadas:>10} {segundos:>10.3f} {neto_mb:>18}\n")
+
+        for nombre, _, _, stats, hilos in self.etapas:
+            if stats is None:
+                continue
+            for orden in ('cumulative', 'tottime'):
+                salida.write(f"\n[Hotspots CPU - {nombre} (+{hilos} hilos) - orden: {orden}]\n")
+                stats.stream = salida
+                stats.sort_stats(orden).print_stats(TOP_HOTSPOTS)
+
+        with open(self.reporte, 'w', encoding='utf-8') as f:
+            f.write(salida.getvalue())
+
+    def finalizar(self):
+        if self._finalizado:
+            return
+        self._finalizado = True
+        self.terminar_etapa()
+        self.escribir_reporte()
+        if self.memoria:
+            tracemalloc.stop()
+        print(f"[*] Reporte de perfilado guardado en: {self.reporte}")
+
+
+_activo: Optional[_Perfilador] = None
+
+
+def activar(cpu: bool = True, memoria: bool = False, reporte: Optional[str] = None):
+    """Activa el perfilado para el resto del proceso (el reporte se escribe al finalizar o al salir)"""
+    global _activo
+    if not (cpu or memoria):
+        return
+    _activo = _Perfilador(cpu, memoria, reporte or REPORTE_DEFAULT)
+    atexit.register(finalizar)
+
+
+def activo() -> bool:
+    return _activo is not None
+
+
+def instrumentar(clase):
+    """Envuelve los métodos públicos de la clase para medir llamadas, tiempo y memoria neta"""
+    if _activo is None:
+        return clase
+    for nombre, atributo in list(vars(clase).items()):
+        if nombre.startswith('_') or not callable(atributo):
+            continue
+        setattr(clase, nombre, _activo.medir_metodo(f"{clase.__name__}.{nombre}", atributo))
+    return clase
+
+
+def marcar_etapa(nombre: str):
+    """Cierra la etapa en curso (si hay) e inicia una nueva"""
+    if _activo is not None:
+        _activo.iniciar_etapa(nombre)
+
+
+def terminar_etapa():
+    if _activo is not None:
+        _activo.terminar_etapa()
+
+
+def finalizar():
+    if _activo is not None:
+        _activo.finalizar()
+
+
+def agregar_argumentos(parser):
+    """Agrega --profile, --trace-memory y --profile-report a un argparse.ArgumentParser"""
+    parser.add_argument('--profile', action='store_true', help='Perfilar CPU por etapa (cProfile)')
+    parser.add_argument('--trace-memory', action='store_true', help='Medir memoria por etapa (tracemalloc)')
+    parser.add_argument('--profile-report', default=REPORTE_DEFAULT, help='Archivo del reporte de perfilado')
+
+
+def activar_desde_argumentos(args, *clases):
+    """Activa el perfilado según los argumentos de agregar_argumentos e instrumenta las clases dadas"""
+    if args.profile or args.trace_memory:
+        activar(cpu=args.profile, memoria=args.trace_memory, reporte=args.profile_report)
+        for clase in clases:
+            instrumentar(clase)
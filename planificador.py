@@ -0,0 +1,90 @@
+"""
+Planificación del enriquecimiento (PASO 1) por valor y con presupuesto de tiempo
+Ordena los issues para que, si el tiempo se agota, ya estén procesados los que más importan:
+1. Issues abiertos (estado actual distinto de cerrado)
+2. Filas a las que les falta algún hito
+3. Issues actualizados más recientemente
+"""
+import os
+import time
+from typing import Optional, List, Dict
+
+from almacen import fecha_a_epoch
+from hitos import COLUMNA_CIERRE, estado_cerrado
+
+
+def cargar_presupuesto_segundos() -> Optional[float]:
+    """Presupuesto de tiempo del PASO 1 desde config.py (PRESUPUESTO_SEGUNDOS) o variable de entorno"""
+    presupuesto = None
+    try:
+        import config
+        presupuesto = getattr(config, 'PRESUPUESTO_SEGUNDOS', None)
+    except ImportError:
+        pass
+    if presupuesto is None and os.getenv('PRESUPUESTO_SEGUNDOS'):
+        presupuesto = os.getenv('PRESUPUESTO_SEGUNDOS')
+    return float(presupuesto) if presupuesto else None
+
+
+class Presupuesto:
+    """Plazo de reloj (monotónico) para cortar el trabajo de forma limpia"""
+
+    def __init__(self, segundos: Optional[float] = None):
+        self.segundos = segundos
+        self.inicio = time.monotonic()
+
+    def restante(self) -> Optional[float]:
+        if self.segundos is None:
+            return None
+        return self.segundos - (time.monotonic() - self.inicio)
+
+    def agotado(self) -> bool:
+        restante = self.restante()
+        return restante is not None and restante <= 0
+
+
+def esta_abierto(estado: Optional[str], fecha_cierre: str = '', definicion_cierre: Optional[Dict] = None) -> bool:
+    """
+    Un issue está abierto si su estado no cumple la regla del hito de cierre (ver hitos.definicion_cierre);
+    sin estado conocido o sin hito de cierre configurado se usa la fecha del hito de cierre
+    """
+    if estado and definicion_cierre is not None:
+        return not estado_cerrado(definicion_cierre, estado)
+    return not fecha_cierre
+
+
+def ordenar_por_prioridad(issues: List[Dict], metadatos: Dict[str, Dict],
+                          columnas_hitos: List[str], definicion_cierre: Optional[Dict] = None) -> List[int]:
+    """
+    Calcula el orden de procesamiento sin alterar el orden de las filas de salida.
+
+    Args:
+        issues: Filas leídas (con 'Clave' y las columnas de hitos actuales)
+        metadatos: clave -> {'estado', 'actualizado'} (ver AlmacenIssues.obtener_metadatos)
+        columnas_hitos: Columnas de hitos configuradas
+        definicion_cierre: Hito de cierre (hitos.definicion_cierre) que decide si un estado es cerrado
+
+    Returns:
+        Índices de issues en orden de prioridad
+    """
+    columna_cierre = definicion_cierre['columna'] if definicion_cierre else COLUMNA_CIERRE
+
+    def prioridad(indice):
+        issue_data = issues[indice]
+        meta = metadatos.get(issue_data.get('Clave', '').strip()) or {}
+        abierto = esta_abierto(meta.get('estado'), str(issue_data.get(columna_cierre) or '').strip(),
+                               definicion_cierre)
+        falta_hito = any(not str(issue_data.get(c) or '').strip() for c in columnas_hitos)
+        actualizado = fecha_a_epoch(meta.get('actualizado')) or 0.0
+        return (not abierto, not falta_hito, -actualizado, indice)
+
+    return sorted(range(len(issues)), key=prioridad)
+
+
+def prioridad_cola(estado: Optional[str], actualizado: Optional[str],
+                   definicion_cierre: Optional[Dict] = None) -> float:
+    """
+    Prioridad numérica para la cola de trabajo (mayor = antes) con el mismo criterio:
+    abiertos primero y, dentro de cada grupo, los actualizados más recientemente
+    """
+    return (1e12 if esta_abierto(estado, definicion_cierre=definicion_cierre) else 0.0) + (fecha_a_epoch(actualizado) or 0.0)
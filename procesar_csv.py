@@ -1,12 +1,35 @@
 """
-Script para procesar XLSX y llenar fechas de cambio de estado
-Lee Libro1.xlsx y busca fechas de cambio a "with RSOC" y "with Local Security"
+Script para procesar XLSX o CSV y llenar fechas de cambio de estado
+Lee Libro1.xlsx (o Libro1.csv) y busca fechas de cambio a "with RSOC" y "with Local Security"
 """
 from jira_integration import JiraIntegration
+from almacen import AlmacenIssues, COLUMNAS_DIFERENCIAS
+from hitos import cargar_definiciones_hitos, definicion_cierre, estado_cerrado, COLUMNA_CIERRE
+import perfilado
+from reporte_sla import calcular_resumen, cargar_agrupaciones, ENCABEZADOS_RESUMEN, COLUMNA_ASIGNADO
+from calendario_sla import calcular_diferencias_habiles
+from cola_trabajo import ColaTrabajo, VISIBILIDAD_DEFAULT
+from planificador import Presupuesto, cargar_presupuesto_segundos, ordenar_por_prioridad
+from obtener_issues_jql import VENTANA_HORAS
 import os
+import csv
+import json
+import time
+import socket
 from datetime import datetime
-from openpyxl import load_workbook, Workbook
-from openpyxl.utils import get_column_letter
+from openpyxl import load_workbook
+
+FORMATOS_COLUMNARES = ('parquet', 'arrow')
+FORMATOS_VALIDOS = ('xlsx', 'csv') + FORMATOS_COLUMNARES
+
+# Claves por arriendo en modo trabajador (--trabajador)
+LOTE_COLA_DEFAULT = 20
+
+# Buffer de lectura/escritura de CSV (1 MB)
+BUFFER_CSV = 1 << 20
+
+# Manifiesto de particiones selladas dentro del directorio de particiones (versionado en git)
+MANIFIESTO_PARTICIONES = 'selladas.json'
 
 def parse_jira_date(date_str):
     """Convierte fecha de Jira a datetime"""
@@ -65,19 +88,293 @@ def calcular_diferencias_horas(issue_data):
     else:
         issue_data['I.respuesta Sub'] = ''
 
-def procesar_csv(archivo_entrada='Libro1.xlsx', archivo_salida=None):
+def enriquecer_issue(jira, issue_data, definiciones, membresia=None, columna_asignado=None):
+    """
+    Llena las columnas de hitos de una fila desde el changelog de Jira (siempre desde cero:
+    los hitos no encontrados quedan vacíos) y el estado actual según el último cambio de status,
+    que guardar_filas actualiza en el almacén (el descubrimiento solo lo refresca dentro de su ventana)
+    
+    Args:
+        membresia: Resultado de la poda JQL (columna -> claves que pueden tener el hito). Solo decide
+            si se descarga el changelog: si se descarga, se evalúan todos los hitos con él
+        columna_asignado: Hito cuya persona se guarda en COLUMNA_ASIGNADO (resumen SLA)
+    
+    Returns:
+        False si la poda descartó todos los hitos y no se descargó el changelog
+    
+    Raises:
+        ChangelogNoDisponible: Si no se pudo descargar el changelog (la fila no se modifica)
+    """
+    membresia = membresia or {}
+    issue_key = issue_data.get('Clave', '').strip()
+    # Según la poda JQL el issue no puede tener ningún hito: no se descarga el changelog
+    descargar = not membresia or any(d['columna'] not in membresia or issue_key in membresia[d['columna']]
+                                     for d in definiciones)
+    resultados = jira.get_milestone_dates(issue_key, definiciones) if descargar else {}
+    for definicion in definiciones:
+        columna = definicion['columna']
+        resultado = resultados.get(columna)
+        issue_data[columna] = resultado['date'] if resultado else ''
+        if resultado and columna == columna_asignado:
+            issue_data[COLUMNA_ASIGNADO] = resultado['value']
+    if descargar:
+        issue_data['estado'] = jira.get_current_status(issue_key)
+    return descargar
+
+def escalamiento_previo(issue_data):
+    """
+    Condición del PASO 3: Escalamiento (with Local Security) anterior a First response
+    
+    Returns:
+        (escalamiento_date, first_response_date) si la fila debe eliminarse, None si se mantiene
+    """
+    escalamiento_str = issue_data.get('with Local Security', '').strip()
+    first_response_str = issue_data.get('First response', '').strip()
+    
+    # Solo eliminar si ambas fechas existen
+    if escalamiento_str and first_response_str:
+        try:
+            # Convertir las fechas a datetime para comparar
+            escalamiento_date = parse_jira_date(escalamiento_str)
+            first_response_date = parse_jira_date(first_response_str)
+            
+            # Eliminar solo si Escalamiento < First response
+            if escalamiento_date and first_response_date and escalamiento_date < first_response_date:
+                return escalamiento_date, first_response_date
+        except Exception as e:
+            # Si hay error al parsear fechas, mantener la fila
+            pass
+    return None
+
+def cargar_formatos_salida():
+    """Formatos de salida desde config.py (FORMATOS_SALIDA) o variable de entorno; None si no hay configuración"""
+    formatos = None
+    try:
+        import config
+        formatos = getattr(config, 'FORMATOS_SALIDA', None)
+    except ImportError:
+        pass
+    if not formatos and os.getenv('FORMATOS_SALIDA'):
+        formatos = [f.strip() for f in os.getenv('FORMATOS_SALIDA').split(',') if f.strip()]
+    return list(formatos) if formatos else None
+
+def formato_por_extension(archivo):
+    """'csv' si el archivo termina en .csv; cualquier otra extensión se trata como XLSX"""
+    return 'csv' if os.path.splitext(archivo)[1].lower() == '.csv' else 'xlsx'
+
+def _normalizar_encabezado(valor):
+    """Encabezado sin espacios alrededor ni BOM (los CSV exportados desde Excel lo incluyen)"""
+    return str(valor).replace('\ufeff', '').strip() if valor is not None else ''
+
+def _completar_fila(issue_dict, todas_las_columnas):
+    # Asegurar que todas las columnas necesarias existan en el diccionario
+    for col_name in todas_las_columnas:
+        if col_name not in issue_dict:
+            issue_dict[col_name] = ''
+    return issue_dict
+
+def _leer_xlsx(archivo_entrada, todas_las_columnas):
+    wb = load_workbook(archivo_entrada, read_only=True, data_only=True)
+    ws = wb.active
+    filas = ws.iter_rows(values_only=True)
+    headers = [_normalizar_encabezado(v) for v in next(filas, ())]
+    issues = []
+    for row in filas:
+        issue_dict = {}
+        for col_name, value in zip(headers, row):
+            if col_name:
+                # Convertir a string si no es None
+                issue_dict[col_name] = str(value) if value is not None else ''
+        _completar_fila(issue_dict, todas_las_columnas)
+        if issue_dict.get('Clave', '').strip():
+            issues.append(issue_dict)
+    wb.close()
+    return issues
+
+def _leer_csv(archivo_entrada, todas_las_columnas):
+    issues = []
+    with open(archivo_entrada, 'r', newline='', encoding='utf-8-sig', buffering=BUFFER_CSV) as f:
+        reader = csv.reader(f)
+        headers = [_normalizar_encabezado(v) for v in next(reader, [])]
+        for row in reader:
+            issue_dict = {col_name: value for col_name, value in zip(headers, row) if col_name}
+            _completar_fila(issue_dict, todas_las_columnas)
+            if issue_dict.get('Clave', '').strip():
+                issues.append(issue_dict)
+    return issues
+
+def leer_issues(archivo_entrada, todas_las_columnas):
+    """
+    Lee las filas del archivo de entrada (XLSX o CSV según la extensión) con la misma semántica:
+    encabezados normalizados, valores como texto, todas las columnas presentes y solo filas con Clave
+    """
+    if formato_por_extension(archivo_entrada) == 'csv':
+        return _leer_csv(archivo_entrada, todas_las_columnas)
+    return _leer_xlsx(archivo_entrada, todas_las_columnas)
+
+def cargar_poda_jql():
+    """Poda JQL previa al PASO 1 desde config.py (PODA_JQL) o variable de entorno; activa por defecto
+    (solo se aplica si todos los hitos tienen predicado JQL)"""
+    poda = None
+    try:
+        import config
+        poda = getattr(config, 'PODA_JQL', None)
+    except ImportError:
+        pass
+    if poda is None and os.getenv('PODA_JQL'):
+        poda = os.getenv('PODA_JQL').strip().lower() not in ('0', 'false', 'no')
+    return True if poda is None else bool(poda)
+
+def cargar_directorio_particiones():
+    """Directorio de salida particionada desde config.py (DIRECTORIO_PARTICIONES) o variable de entorno"""
+    directorio = None
+    try:
+        import config
+        directorio = getattr(config, 'DIRECTORIO_PARTICIONES', None)
+    except ImportError:
+        pass
+    return directorio or os.getenv('DIRECTORIO_PARTICIONES') or None
+
+def leer_manifiesto_particiones(directorio_particiones):
+    """
+    Particiones selladas según el manifiesto versionado junto a los archivos de partición.
+    El almacén vive en la caché de CI y puede perderse; el manifiesto restaura su estado de sellado.
     """
-    Procesa el XLSX y llena las columnas con fechas de cambio de estado
+    ruta = os.path.join(directorio_particiones, MANIFIESTO_PARTICIONES)
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, encoding='utf-8') as f:
+        return list(json.load(f).get('selladas', []))
+
+def escribir_manifiesto_particiones(directorio_particiones, selladas):
+    """Escribe el manifiesto de particiones selladas (ordenadas, para diffs estables en git)"""
+    ruta = os.path.join(directorio_particiones, MANIFIESTO_PARTICIONES)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({'selladas': sorted(selladas)}, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+def exportar_resultados(archivo_salida, issues, columnas_hitos, formatos):
+    """
+    Exporta las filas procesadas desde el almacén: XLSX (con hoja Resumen SLA), CSV y formatos columnares
     
     Args:
-        archivo_entrada: Nombre del archivo XLSX de entrada
-        archivo_salida: Nombre del archivo XLSX de salida (si None, sobrescribe el original)
+        archivo_salida: Archivo de salida; cada formato usa el mismo nombre con su extensión
+        issues: Filas procesadas (definen qué claves y en qué orden se exportan)
+        columnas_hitos: Columnas de fechas configuradas
+        formatos: Formatos de salida ('xlsx', 'csv', 'parquet', 'arrow')
     """
+    fieldnames = ['Clave'] + columnas_hitos + COLUMNAS_DIFERENCIAS
+    base_salida = os.path.splitext(archivo_salida)[0]
+    claves_salida = [i.get('Clave', '').strip() for i in issues]
+    
+    # Resumen SLA (media, mediana, p90, p95) en una hoja junto a los datos
+    hojas_extra = {}
+    try:
+        resumen = calcular_resumen(issues, cargar_agrupaciones())
+        hojas_extra['Resumen SLA'] = (ENCABEZADOS_RESUMEN, resumen)
+        print(f"[OK] Resumen SLA calculado ({len(resumen)} filas)")
+        for fila in resumen:
+            if fila[1] == 'Total' and fila[0] == resumen[0][0]:
+                print(f"    {fila[2]}: n={fila[3]} media={fila[4]} mediana={fila[5]} p90={fila[6]} p95={fila[7]}")
+    except Exception as e:
+        print(f"[!] Error al calcular el resumen SLA: {e}")
+    
+    if 'csv' in formatos:
+        archivo_csv = f"{base_salida}.csv"
+        try:
+            with AlmacenIssues() as almacen:
+                filas = almacen.exportar_csv(archivo_csv, claves=claves_salida, columnas_hitos=columnas_hitos)
+            print(f"[OK] Archivo csv guardado: {archivo_csv} ({filas} filas, {len(fieldnames)} columnas)")
+        except Exception as e:
+            print(f"[ERROR] Error al guardar {archivo_csv}: {e}")
+    
+    if 'xlsx' in formatos:
+        archivo_salida = f"{base_salida}.xlsx"
+        try:
+            # El XLSX es una vista de exportación generada desde el almacén
+            print(f"[*] Exportando {len(issues)} issues con {len(fieldnames)} columnas desde el almacén...")
+            with AlmacenIssues() as almacen:
+                almacen.exportar_xlsx(archivo_salida, claves=claves_salida,
+                                      columnas_hitos=columnas_hitos, hojas_extra=hojas_extra)
+            print(f"[OK] Archivo guardado exitosamente: {archivo_salida}")
+            print(f"[DEBUG] Verificando archivo guardado...")
+            # Verificar que el archivo se guardó correctamente
+            try:
+                wb_check = load_workbook(archivo_salida, data_only=True)
+                ws_check = wb_check.active
+                headers_check = [cell.value for cell in ws_check[1]]
+                print(f"[DEBUG] Columnas en archivo guardado: {headers_check}")
+                print(f"[DEBUG] Total columnas: {len(headers_check)}")
+            except Exception as e:
+                print(f"[DEBUG] Error al verificar archivo: {e}")
+            
+            # Estadísticas finales
+            con_rsoc = sum(1 for i in issues if i.get('with RSOC', '').strip())
+            con_local = sum(1 for i in issues if i.get('with Local Security', '').strip())
+            con_closed = sum(1 for i in issues if i.get('Closed', '').strip())
+            con_first_response = sum(1 for i in issues if i.get('First response', '').strip())
+            completos = sum(1 for i in issues if i.get('with RSOC', '').strip() and i.get('with Local Security', '').strip())
+            
+            print(f"\n[*] Estadisticas finales:")
+            print(f"    Issues con fecha 'with RSOC': {con_rsoc}")
+            print(f"    Issues con fecha 'with Local Security': {con_local}")
+            print(f"    Issues con fecha 'Closed': {con_closed}")
+            print(f"    Issues con fecha 'First response': {con_first_response}")
+            print(f"    Issues completos (ambas fechas): {completos}")
+            
+        except Exception as e:
+            print(f"[ERROR] Error al guardar el XLSX: {e}")
+            import traceback
+            traceback.print_exc()
+    
+    # Exportación columnar (Parquet / Arrow IPC) con timestamps reales y diferencias como float
+    for formato in formatos:
+        if formato not in FORMATOS_COLUMNARES:
+            continue
+        archivo_columnar = f"{base_salida}.{formato}"
+        try:
+            with AlmacenIssues() as almacen:
+                filas = almacen.exportar_columnar(archivo_columnar, claves=claves_salida,
+                                                  columnas_hitos=columnas_hitos, formato=formato)
+            print(f"[OK] Archivo {formato} guardado: {archivo_columnar} ({filas} filas)")
+        except Exception as e:
+            print(f"[ERROR] Error al guardar {archivo_columnar}: {e}")
+
+def procesar_csv(archivo_entrada='Libro1.xlsx', archivo_salida=None, formatos=None, directorio_particiones=None,
+                 presupuesto_segundos=None, poda_jql=None):
+    """
+    Procesa el XLSX o CSV y llena las columnas con fechas de cambio de estado
+    
+    Args:
+        archivo_entrada: Nombre del archivo de entrada (XLSX o CSV, según la extensión)
+        archivo_salida: Nombre del archivo de salida (si None, sobrescribe el original)
+        formatos: Formatos de salida ('xlsx', 'csv', 'parquet', 'arrow'); None usa cargar_formatos_salida()
+            o, sin configuración, el formato del archivo de salida según su extensión
+        directorio_particiones: Si se indica, se procesan solo las particiones semanales abiertas
+            del almacén (no se lee archivo_entrada) y se escribe un archivo por partición
+        presupuesto_segundos: Tiempo máximo del PASO 1; los issues se procesan por prioridad
+            (abiertos, con hitos faltantes, actualizados recientemente) y al agotarse se
+            escriben los resultados parciales. None usa cargar_presupuesto_segundos()
+        poda_jql: Consultar antes por JQL qué issues pueden tener cada hito y omitir las búsquedas
+            (o la descarga completa del changelog) que no pueden coincidir. None usa cargar_poda_jql()
+    """
+    # El presupuesto cuenta desde el inicio (conexión y lectura incluidas)
+    if presupuesto_segundos is None:
+        presupuesto_segundos = cargar_presupuesto_segundos()
+    presupuesto = Presupuesto(presupuesto_segundos)
     
     if archivo_salida is None:
         archivo_salida = archivo_entrada
     
+    # Sin formatos configurados se escribe en el formato del archivo de salida
+    formatos = formatos or cargar_formatos_salida() or [formato_por_extension(archivo_salida)]
+    invalidos = [f for f in formatos if f not in FORMATOS_VALIDOS]
+    if invalidos:
+        print(f"[ERROR] Formatos de salida no válidos: {invalidos} (usar {FORMATOS_VALIDOS})")
+        return
+    
     # Inicializar conexión a Jira
+    perfilado.marcar_etapa('Conexión y lectura')
     try:
         print("[*] Conectando a Jira...")
         jira = JiraIntegration()
@@ -86,167 +383,172 @@ def procesar_csv(archivo_entrada='Libro1.xlsx', archivo_salida=None):
         print(f"[ERROR] Error al conectar con Jira: {e}")
         return
     
-    # Leer el XLSX
-    print(f"[*] Leyendo archivo: {archivo_entrada}")
-    issues = []
-    
+    # Cargar definiciones de hitos (columnas de fechas) desde config
     try:
-        wb = load_workbook(archivo_entrada, data_only=True)
-        ws = wb.active
-        
-        # Leer encabezados
-        headers = []
-        for cell in ws[1]:
-            headers.append(cell.value if cell.value else '')
-        
-        # Definir todas las columnas que necesitamos (asegurar que existan)
-        todas_las_columnas = ['Clave', 'with RSOC', 'with Local Security', 'Closed', 'First response',
-                             'I.First Response', 'I.Escalamiento', 'I.respuesta Sub']
-        
-        # Leer datos
-        for row in ws.iter_rows(min_row=2, values_only=False):
-            issue_dict = {}
-            # Primero leer las columnas que existen en el Excel
-            for idx, cell in enumerate(row):
-                if idx < len(headers):
-                    col_name = headers[idx]
-                    if col_name:
-                        value = cell.value
-                        # Convertir a string si no es None
-                        issue_dict[col_name] = str(value) if value is not None else ''
-            
-            # Asegurar que todas las columnas necesarias existan en el diccionario
-            for col_name in todas_las_columnas:
-                if col_name not in issue_dict:
-                    issue_dict[col_name] = ''
-            
-            if issue_dict.get('Clave', '').strip():
-                issues.append(issue_dict)
-        
-        print(f"[OK] Se encontraron {len(issues)} issues en el XLSX\n")
-    except Exception as e:
-        print(f"[ERROR] Error al leer el XLSX: {e}")
+        definiciones = cargar_definiciones_hitos()
+    except ValueError as e:
+        print(f"[ERROR] Configuración de hitos inválida: {e}")
         return
+    columnas_hitos = [d['columna'] for d in definiciones]
+    # Hito de asignación cuya persona se usa para agrupar el resumen SLA
+    columna_asignado = next((d['columna'] for d in definiciones if d['campo'] == 'assignee'), None)
+    # Hito de cierre: su regla decide qué estados son terminales (prioridad y sellado de particiones)
+    cierre = definicion_cierre(definiciones)
+    
+    # Definir todas las columnas que necesitamos (asegurar que existan)
+    todas_las_columnas = ['Clave'] + columnas_hitos + COLUMNAS_DIFERENCIAS
+    
+    particiones_abiertas = None
+    if directorio_particiones:
+        # Leer solo las particiones abiertas (no selladas) desde el almacén
+        print("[*] Leyendo particiones abiertas desde el almacén...")
+        try:
+            with AlmacenIssues() as almacen:
+                # Restaurar los sellos del manifiesto (el almacén de la caché puede haberse perdido)
+                restauradas = [n for n in leer_manifiesto_particiones(directorio_particiones)
+                               if n not in almacen.particiones_selladas()]
+                for nombre in restauradas:
+                    almacen.sellar_particion(nombre)
+                if restauradas:
+                    print(f"[*] {len(restauradas)} particiones selladas restauradas desde {MANIFIESTO_PARTICIONES}")
+                particiones_abiertas = almacen.obtener_particiones(solo_abiertas=True)
+                claves = [c for claves_particion in particiones_abiertas.values() for c in claves_particion]
+                issues = almacen.obtener_filas(claves, columnas_hitos=columnas_hitos)
+                total_selladas = len(almacen.particiones_selladas())
+            print(f"[OK] {len(particiones_abiertas)} particiones abiertas ({total_selladas} selladas), "
+                  f"{len(issues)} issues\n")
+        except Exception as e:
+            print(f"[ERROR] Error al leer las particiones del almacén: {e}")
+            return
+    else:
+        # Leer el archivo de entrada (formato según la extensión)
+        print(f"[*] Leyendo archivo: {archivo_entrada}")
+        try:
+            issues = leer_issues(archivo_entrada, todas_las_columnas)
+            print(f"[OK] Se encontraron {len(issues)} issues en {archivo_entrada}\n")
+        except Exception as e:
+            print(f"[ERROR] Error al leer {archivo_entrada}: {e}")
+            return
     
     if not issues:
-        print("[ERROR] No se encontraron issues en el XLSX")
+        print("[ERROR] No se encontraron issues para procesar")
         return
     
+    perfilado.marcar_etapa('PASO 1')
     # PASO 1: Agregar fechas desde Jira (with RSOC, with Local Security, Closed, First response)
     print("\n" + "=" * 80)
     print("[PASO 1] Agregando fechas desde Jira...")
     print("=" * 80)
     print("-" * 80)
     
-    encontrados_rsoc = 0
-    encontrados_local = 0
-    encontrados_closed = 0
-    encontrados_first_response = 0
-    errores = 0
-    
-    # Obtener lista de personas para First response desde config
+    # Orden de procesamiento por prioridad (las filas de salida conservan su orden)
     try:
-        import config
-        target_assignees = getattr(config, 'FIRST_RESPONSE_ASSIGNEES', [])
-        if not target_assignees:
-            print("[!] Advertencia: No se encontró FIRST_RESPONSE_ASSIGNEES en config.py")
-            target_assignees = []
-    except ImportError:
-        # Si no hay config.py, intentar desde variables de entorno
-        import os
-        assignees_str = os.getenv('FIRST_RESPONSE_ASSIGNEES', '')
-        if assignees_str:
-            target_assignees = [a.strip() for a in assignees_str.split(',')]
-        else:
-            print("[!] Advertencia: No se encontró configuración de FIRST_RESPONSE_ASSIGNEES")
-            target_assignees = []
-    
-    for i, issue_data in enumerate(issues, 1):
+        with AlmacenIssues() as almacen:
+            metadatos = almacen.obtener_metadatos([i.get('Clave', '').strip() for i in issues])
+    except Exception as e:
+        print(f"[!] No se pudieron leer estados del almacén, se prioriza solo por hitos faltantes: {e}")
+        metadatos = {}
+    orden = ordenar_por_prioridad(issues, metadatos, columnas_hitos, cierre)
+    if presupuesto.segundos is not None:
+        print(f"[*] Presupuesto de tiempo: {presupuesto.segundos:.0f}s (restan {presupuesto.restante():.0f}s)")
+    
+    # Poda JQL: conjuntos de claves que pueden tener cada hito (unas pocas búsquedas en lote)
+    if poda_jql is None:
+        poda_jql = cargar_poda_jql()
+    membresia = {}
+    if poda_jql:
+        try:
+            no_podables = jira.milestones_without_pruning(definiciones)
+            if no_podables:
+                # Todo issue necesita su changelog por estos hitos: las búsquedas serían solo costo
+                print(f"[*] Poda JQL omitida: hitos sin predicado JQL (campo 'jql'): {', '.join(no_podables)}")
+                poda_jql = False
+            else:
+                claves_issues = [i.get('Clave', '').strip() for i in issues]
+                membresia = jira.build_milestone_membership(claves_issues, definiciones)
+                for columna, claves_hito in membresia.items():
+                    print(f"[OK] Poda JQL '{columna}': {len(claves_hito)}/{len(claves_issues)} issues pueden tenerlo")
+        except Exception as e:
+            print(f"[!] Error en la poda JQL, se revisan todos los hitos: {e}")
+            membresia = {}
+    
+    encontrados = {columna: 0 for columna in columnas_hitos}
+    errores = 0
+    procesados = set()
+    omitidos = 0
+    
+    def imprimir_conteos():
+        for columna in columnas_hitos:
+            print(f"    {columna} encontrados: {encontrados[columna]}")
+        print(f"    Errores: {errores}")
+    
+    for i, indice in enumerate(orden, 1):
+        if presupuesto.agotado():
+            print(f"\n[!] Presupuesto de tiempo agotado: {i - 1}/{len(issues)} issues procesados por prioridad")
+            break
+        issue_data = issues[indice]
         issue_key = issue_data.get('Clave', '').strip()
         if not issue_key:
             continue
+        procesados.add(indice)
             
         print(f"[{i}/{len(issues)}] {issue_key}...", end=' ')
         
         try:
-            # Debug: Verificar changelog antes de buscar fechas (solo para primeros 3 issues)
-            if i <= 3:
+            # Todos los hitos en una sola pasada del changelog - SIEMPRE buscar desde cero (como primera vez)
+            if not enriquecer_issue(jira, issue_data, definiciones, membresia, columna_asignado):
+                omitidos += 1
+            elif i <= 3:
+                # Debug: tamaño del changelog (solo primeros 3 issues; ya está en caché, no se descarga
+                # de nuevo, y los issues podados no se descargan)
                 test_changelog = jira.get_changelog(issue_key)
                 print(f"[DEBUG] {issue_key}: Changelog tiene {len(test_changelog)} cambios", end=' ')
-            
-            # Buscar fecha de cambio a "with RSOC" - SIEMPRE buscar desde cero (como primera vez)
-            rsoc_result = jira.get_status_change_date(issue_key, "with RSOC")
-            if rsoc_result:
-                fecha_rsoc = rsoc_result['date']
-                issue_data['with RSOC'] = fecha_rsoc
-                encontrados_rsoc += 1
-                print(f"RSOC: OK ({fecha_rsoc})", end=' ')
-            else:
-                # Si no se encuentra, limpiar el valor (como primera vez)
-                issue_data['with RSOC'] = ''
-                print("RSOC: no encontrado", end=' ')
-            
-            # Buscar fecha de cambio a "with Local Security" - SIEMPRE buscar desde cero (como primera vez)
-            local_result = jira.get_status_change_date(issue_key, "with Local Security")
-            if local_result:
-                fecha_local = local_result['date']
-                issue_data['with Local Security'] = fecha_local
-                encontrados_local += 1
-                print(f"Local: OK ({fecha_local})", end=' ')
-            else:
-                # Si no se encuentra, limpiar el valor (como primera vez)
-                issue_data['with Local Security'] = ''
-                print("Local: no encontrado", end=' ')
-            
-            # Buscar fecha de cambio a "Closed" - SIEMPRE buscar desde cero (como primera vez)
-            closed_result = jira.get_status_change_date(issue_key, "Closed")
-            if closed_result:
-                fecha_closed = closed_result['date']
-                issue_data['Closed'] = fecha_closed
-                encontrados_closed += 1
-                print(f"Closed: OK ({fecha_closed})", end=' ')
-            else:
-                # Si no se encuentra, limpiar el valor (como primera vez)
-                issue_data['Closed'] = ''
-                print("Closed: no encontrado", end=' ')
-            
-            # Buscar fecha de asignación a personas específicas (First response) - SIEMPRE buscar desde cero (como primera vez)
-            first_response_result = jira.get_assignee_change_date(issue_key, target_assignees)
-            if first_response_result:
-                fecha_first = first_response_result['date']
-                issue_data['First response'] = fecha_first
-                encontrados_first_response += 1
-                print(f"First response: OK ({fecha_first})", end=' ')
-            else:
-                # Si no se encuentra, limpiar el valor (como primera vez)
-                issue_data['First response'] = ''
-                print("First response: no encontrado", end=' ')
+            for columna in columnas_hitos:
+                if issue_data[columna]:
+                    encontrados[columna] += 1
+                    print(f"{columna}: OK ({issue_data[columna]})", end=' ')
+                else:
+                    print(f"{columna}: no encontrado", end=' ')
             
             print()  # Nueva línea
             
         except Exception as e:
             errores += 1
             print(f"[ERROR] {e}")
+            # Sin changelog no se sabe nada nuevo: se conservan los hitos del almacén (ver pendientes)
+            procesados.discard(indice)
             # Continuar con el siguiente issue
         
         # Mostrar progreso cada 10 issues
         if i % 10 == 0:
             print(f"\n[*] Progreso: {i}/{len(issues)} procesados")
-            print(f"    RSOC encontrados: {encontrados_rsoc}")
-            print(f"    Local Security encontrados: {encontrados_local}")
-            print(f"    Closed encontrados: {encontrados_closed}")
-            print(f"    First response encontrados: {encontrados_first_response}")
-            print(f"    Errores: {errores}\n")
+            imprimir_conteos()
+            print()
     
     print("-" * 80)
     print(f"\n[OK] Paso 1 completado - Fechas agregadas")
     print(f"    Total issues: {len(issues)}")
-    print(f"    RSOC encontrados: {encontrados_rsoc}")
-    print(f"    Local Security encontrados: {encontrados_local}")
-    print(f"    Closed encontrados: {encontrados_closed}")
-    print(f"    First response encontrados: {encontrados_first_response}")
-    print(f"    Errores: {errores}")
+    if membresia:
+        print(f"    Changelogs omitidos por poda JQL: {omitidos}")
+    imprimir_conteos()
+    
+    # Issues sin procesar (falta de tiempo o error al descargar el changelog): conservar lo
+    # último conocido en el almacén para que guardar_filas no borre hitos ya guardados
+    pendientes = [issues[i] for i in range(len(issues)) if i not in procesados]
+    if pendientes:
+        print(f"[!] {len(pendientes)} issues quedan pendientes para la próxima ejecución (se conservan sus hitos guardados)")
+        try:
+            with AlmacenIssues() as almacen:
+                guardadas = almacen.obtener_filas([i.get('Clave', '').strip() for i in pendientes],
+                                                  columnas_hitos=columnas_hitos)
+            for issue_data, guardada in zip(pendientes, guardadas):
+                for columna in columnas_hitos:
+                    if guardada.get(columna):
+                        issue_data[columna] = guardada[columna]
+        except Exception as e:
+            print(f"[!] Error al leer los hitos guardados de los issues pendientes: {e}")
     
+    perfilado.marcar_etapa('PASO 2')
     # PASO 2: Calcular diferencias en horas (I.First Response, I.Escalamiento, I.respuesta Sub)
     print("\n" + "=" * 80)
     print("[PASO 2] Calculando diferencias en horas...")
@@ -293,8 +595,25 @@ def procesar_csv(archivo_entrada='Libro1.xlsx', archivo_salida=None):
         print(f"         with Local Security: '{primer_issue.get('with Local Security', '')}'")
         print(f"         First response: '{primer_issue.get('First response', '')}'")
     
+    # Diferencias en horas hábiles del equipo (calendario laboral, vectorizado sobre todas las filas)
+    try:
+        calcular_diferencias_habiles(issues)
+        print("[OK] Diferencias en horas hábiles calculadas")
+    except Exception as e:
+        print(f"[!] Error al calcular las diferencias en horas hábiles: {e}")
+    
     print(f"[OK] Paso 2 completado - Diferencias calculadas para {calculados_diferencias} issues")
     
+    # Guardar fechas y diferencias en el almacén persistente (fuente de verdad)
+    try:
+        with AlmacenIssues() as almacen:
+            guardados = almacen.guardar_filas(issues, columnas_hitos=columnas_hitos)
+        print(f"[OK] {guardados} issues guardados en el almacén: {almacen.ruta}")
+    except Exception as e:
+        print(f"[ERROR] Error al guardar en el almacén: {e}")
+        return
+    
+    perfilado.marcar_etapa('PASO 3')
     # PASO 3: Filtrar y eliminar filas cuando Escalamiento (with Local Security) < First response
     print("\n" + "=" * 80)
     print("[PASO 3] Filtrando filas donde Escalamiento < First response...")
@@ -304,24 +623,11 @@ def procesar_csv(archivo_entrada='Libro1.xlsx', archivo_salida=None):
     eliminados = 0
     
     for issue_data in issues:
-        escalamiento_str = issue_data.get('with Local Security', '').strip()
-        first_response_str = issue_data.get('First response', '').strip()
-        
-        # Solo eliminar si ambas fechas existen
-        if escalamiento_str and first_response_str:
-            try:
-                # Convertir las fechas a datetime para comparar
-                escalamiento_date = parse_jira_date(escalamiento_str)
-                first_response_date = parse_jira_date(first_response_str)
-                
-                # Eliminar solo si Escalamiento < First response
-                if escalamiento_date and first_response_date and escalamiento_date < first_response_date:
-                    eliminados += 1
-                    print(f"    [ELIMINADO] {issue_data.get('Clave', 'N/A')}: Escalamiento ({escalamiento_date}) < First response ({first_response_date})")
-                    continue  # Saltar este issue, no agregarlo a issues_filtrados
-            except Exception as e:
-                # Si hay error al parsear fechas, mantener la fila
-                pass
+        fechas = escalamiento_previo(issue_data)
+        if fechas:
+            eliminados += 1
+            print(f"    [ELIMINADO] {issue_data.get('Clave', 'N/A')}: Escalamiento ({fechas[0]}) < First response ({fechas[1]})")
+            continue  # Saltar este issue, no agregarlo a issues_filtrados
         
         # Si no cumple la condición o no tiene ambas fechas, mantenerlo
         issues_filtrados.append(issue_data)
@@ -330,14 +636,14 @@ def procesar_csv(archivo_entrada='Libro1.xlsx', archivo_salida=None):
     print(f"[OK] Paso 3 completado - Filtrado: {eliminados} fila(s) eliminada(s) de {issues_originales} totales")
     print(f"    Issues restantes: {len(issues)}")
     
+    perfilado.marcar_etapa('PASO 4')
     # PASO 4: Escribir el XLSX actualizado con todas las columnas
     print("\n" + "=" * 80)
     print(f"[PASO 4] Guardando resultados en: {archivo_salida}")
     print("=" * 80)
     
     # Definir todas las columnas que deben estar en el Excel final
-    fieldnames = ['Clave', 'with RSOC', 'with Local Security', 'Closed', 'First response',
-                 'I.First Response', 'I.Escalamiento', 'I.respuesta Sub']
+    fieldnames = ['Clave'] + columnas_hitos + COLUMNAS_DIFERENCIAS
     
     # Asegurar que TODOS los issues tengan TODAS las columnas antes de guardar
     print(f"[*] Verificando que todos los issues tengan todas las columnas...")
@@ -367,75 +673,195 @@ def procesar_csv(archivo_entrada='Libro1.xlsx', archivo_salida=None):
     
     print(f"[OK] Todos los issues tienen todas las columnas ({len(fieldnames)} columnas)")
     
-    try:
-        wb = Workbook()
-        ws = wb.active
-        
-        # Escribir encabezados - VERIFICAR que se escriban todos
-        print(f"[DEBUG] Escribiendo {len(fieldnames)} encabezados...")
-        for col_idx, col_name in enumerate(fieldnames, start=1):
-            ws.cell(row=1, column=col_idx, value=col_name)
-            print(f"[DEBUG] Encabezado {col_idx}: {col_name}")
-        
-        # Escribir datos - TODAS las columnas para TODOS los issues
-        print(f"[*] Escribiendo {len(issues)} issues con {len(fieldnames)} columnas...")
-        print(f"[DEBUG] Columnas a escribir: {fieldnames}")
-        
-        for row_idx, issue_data in enumerate(issues, start=2):
-            # Debug: mostrar las primeras 3 issues
-            if row_idx <= 4:
-                print(f"[DEBUG] Issue {row_idx-1}: Clave={issue_data.get('Clave', 'N/A')}, tiene {len(issue_data)} columnas")
-                print(f"         Columnas: {list(issue_data.keys())}")
-            
-            for col_idx, col_name in enumerate(fieldnames, start=1):
-                # Obtener el valor del diccionario
-                value = issue_data.get(col_name, '')
-                # Debug para las primeras filas
-                if row_idx <= 4 and col_name in ['with RSOC', 'with Local Security', 'First response']:
-                    print(f"[DEBUG] Escribiendo {col_name} = '{value}' en fila {row_idx}, columna {col_idx}")
-                ws.cell(row=row_idx, column=col_idx, value=value)
-        
-        wb.save(archivo_salida)
-        print(f"[OK] Archivo guardado exitosamente: {archivo_salida}")
-        print(f"[DEBUG] Verificando archivo guardado...")
-        # Verificar que el archivo se guardó correctamente
+    if particiones_abiertas is None:
+        exportar_resultados(archivo_salida, issues, columnas_hitos, formatos)
+    else:
+        # Modo particionado: un archivo por semana ISO de creación, solo particiones abiertas
+        os.makedirs(directorio_particiones, exist_ok=True)
+        base_salida = os.path.splitext(os.path.basename(archivo_salida))[0]
+        por_clave = {i.get('Clave', '').strip(): i for i in issues}
+        selladas = []
+        for nombre, claves_particion in particiones_abiertas.items():
+            issues_particion = [por_clave[c] for c in claves_particion if c in por_clave]
+            extension = os.path.splitext(archivo_salida)[1] or '.xlsx'
+            archivo_particion = os.path.join(directorio_particiones, f"{base_salida}_{nombre}{extension}")
+            print(f"\n[*] Partición {nombre}: {len(issues_particion)} issues -> {archivo_particion}")
+            exportar_resultados(archivo_particion, issues_particion, columnas_hitos, formatos)
+            try:
+                with AlmacenIssues() as almacen:
+                    # Solo semanas fuera de la ventana de descubrimiento (ya no pueden llegar issues nuevos)
+                    if almacen.particion_completa(claves_particion, columna_cierre=COLUMNA_CIERRE, nombre=nombre,
+                                                  ventana_horas=VENTANA_HORAS,
+                                                  estado_cerrado=lambda estado: estado_cerrado(cierre, estado)):
+                        almacen.sellar_particion(nombre)
+                        selladas.append(nombre)
+            except Exception as e:
+                print(f"[!] Error al sellar la partición {nombre}: {e}")
+        print(f"\n[OK] Particiones escritas: {len(particiones_abiertas)} - selladas en esta ejecución: {selladas or 'ninguna'}")
         try:
-            wb_check = load_workbook(archivo_salida, data_only=True)
-            ws_check = wb_check.active
-            headers_check = [cell.value for cell in ws_check[1]]
-            print(f"[DEBUG] Columnas en archivo guardado: {headers_check}")
-            print(f"[DEBUG] Total columnas: {len(headers_check)}")
+            with AlmacenIssues() as almacen:
+                escribir_manifiesto_particiones(directorio_particiones, almacen.particiones_selladas())
+                # Libro completo (todas las particiones, con el filtro del PASO 3) desde el almacén
+                issues_libro = [i for i in almacen.obtener_filas(columnas_hitos=columnas_hitos)
+                                if not escalamiento_previo(i)]
+            print(f"[OK] Manifiesto de particiones selladas: {os.path.join(directorio_particiones, MANIFIESTO_PARTICIONES)}")
         except Exception as e:
-            print(f"[DEBUG] Error al verificar archivo: {e}")
-        
-        # Estadísticas finales
-        con_rsoc = sum(1 for i in issues if i.get('with RSOC', '').strip())
-        con_local = sum(1 for i in issues if i.get('with Local Security', '').strip())
-        con_closed = sum(1 for i in issues if i.get('Closed', '').strip())
-        con_first_response = sum(1 for i in issues if i.get('First response', '').strip())
-        completos = sum(1 for i in issues if i.get('with RSOC', '').strip() and i.get('with Local Security', '').strip())
-        
-        print(f"\n[*] Estadisticas finales:")
-        print(f"    Issues con fecha 'with RSOC': {con_rsoc}")
-        print(f"    Issues con fecha 'with Local Security': {con_local}")
-        print(f"    Issues con fecha 'Closed': {con_closed}")
-        print(f"    Issues con fecha 'First response': {con_first_response}")
-        print(f"    Issues completos (ambas fechas): {completos}")
-        
-    except Exception as e:
-        print(f"[ERROR] Error al guardar el XLSX: {e}")
-        import traceback
-        traceback.print_exc()
+            print(f"[ERROR] Error al leer el almacén para el libro completo: {e}")
+            issues_libro = None
+        if issues_libro is not None:
+            print(f"\n[*] Libro completo: {len(issues_libro)} issues -> {archivo_salida}")
+            exportar_resultados(archivo_salida, issues_libro, columnas_hitos, formatos)
+    
+    perfilado.terminar_etapa()
 
 
+def procesar_cola(trabajador=None, lote=LOTE_COLA_DEFAULT, visibilidad=VISIBILIDAD_DEFAULT,
+                  presupuesto_segundos=None, poda_jql=None):
+    """
+    Modo trabajador: arrienda lotes de claves de la cola durable (ver cola_trabajo.py), los
+    enriquece, guarda hitos y diferencias en el almacén y confirma (ack). Varios trabajadores,
+    en uno o varios hosts que comparten el almacén, pueden ejecutarse a la vez.
+    Las claves cuyo changelog no se pudo descargar se devuelven a la cola (nack) sin tocar su fila
+    del almacén; los arriendos de un lote largo se extienden (latido) antes de vencer.
+    Termina cuando la cola no tiene claves pendientes ni arrendadas o se agota el presupuesto.
+    El presupuesto se revisa por issue: si se agota a mitad de lote, las claves sin procesar se
+    liberan sin gastar un intento y las ya enriquecidas se guardan y confirman.
+    La exportación se hace después desde el almacén (python almacen.py Libro1.xlsx).
+    
+    Args:
+        trabajador: Identificador del trabajador (por defecto host-pid)
+        lote: Claves por arriendo
+        visibilidad: Segundos del arriendo; si el trabajador se cae, las claves vuelven a la cola
+        presupuesto_segundos: Tiempo máximo; None usa cargar_presupuesto_segundos()
+        poda_jql: Poda JQL por lote; None usa cargar_poda_jql()
+    """
+    if presupuesto_segundos is None:
+        presupuesto_segundos = cargar_presupuesto_segundos()
+    presupuesto = Presupuesto(presupuesto_segundos)
+    trabajador = trabajador or f"{socket.gethostname()}-{os.getpid()}"
+    
+    try:
+        print("[*] Conectando a Jira...")
+        jira = JiraIntegration()
+        print("[OK] Conexion establecida\n")
+    except Exception as e:
+        print(f"[ERROR] Error al conectar con Jira: {e}")
+        return
+    try:
+        definiciones = cargar_definiciones_hitos()
+    except ValueError as e:
+        print(f"[ERROR] Configuración de hitos inválida: {e}")
+        return
+    columnas_hitos = [d['columna'] for d in definiciones]
+    columna_asignado = next((d['columna'] for d in definiciones if d['campo'] == 'assignee'), None)
+    if poda_jql is None:
+        poda_jql = cargar_poda_jql()
+    if poda_jql:
+        no_podables = jira.milestones_without_pruning(definiciones)
+        if no_podables:
+            print(f"[*] Poda JQL omitida: hitos sin predicado JQL (campo 'jql'): {', '.join(no_podables)}")
+            poda_jql = False
+    
+    perfilado.marcar_etapa('Cola de trabajo')
+    cola = ColaTrabajo()
+    print(f"[*] Trabajador '{trabajador}' - cola '{cola.nombre}' en {cola.ruta} - {cola.resumen()}")
+    confirmados = 0
+    try:
+        while not presupuesto.agotado():
+            claves = cola.arrendar(trabajador, lote, visibilidad)
+            ultimo_latido = time.monotonic()
+            if not claves:
+                espera = cola.segundos_hasta_disponible()
+                if espera is None:
+                    break
+                # Claves arrendadas por otros trabajadores: esperar a que terminen o venzan sus arriendos
+                time.sleep(min(max(espera, 1.0), 30.0))
+                continue
+            
+            membresia = {}
+            if poda_jql:
+                try:
+                    membresia = jira.build_milestone_membership(claves, definiciones)
+                except Exception as e:
+                    print(f"[!] Error en la poda JQL del lote: {e}")
+            
+            issues, fallidas, liberadas = [], [], []
+            for posicion, clave in enumerate(claves):
+                if presupuesto.agotado():
+                    # Sin tiempo a mitad de lote: devolver el resto sin gastar intentos y guardar lo hecho
+                    liberadas = claves[posicion:]
+                    cola.liberar(liberadas, trabajador)
+                    break
+                # Latido: extender el arriendo del lote antes de que venza para que otro no lo tome
+                if time.monotonic() - ultimo_latido > visibilidad / 2:
+                    cola.extender(claves, trabajador, visibilidad)
+                    ultimo_latido = time.monotonic()
+                issue_data = {'Clave': clave}
+                try:
+                    enriquecer_issue(jira, issue_data, definiciones, membresia, columna_asignado)
+                    calcular_diferencias_horas(issue_data)
+                    issues.append(issue_data)
+                except Exception as e:
+                    # Incluye ChangelogNoDisponible: reintentar después sin guardar la fila, así un
+                    # fallo de descarga no borra los hitos ya guardados
+                    print(f"[ERROR] {clave}: {e}")
+                    cola.nack([clave], trabajador, error=f"{type(e).__name__}: {str(e)[:200]}", reintentar_en=60)
+                    fallidas.append(clave)
+            
+            try:
+                calcular_diferencias_habiles(issues)
+                with AlmacenIssues() as almacen:
+                    almacen.guardar_filas(issues, columnas_hitos=columnas_hitos)
+            except Exception as e:
+                print(f"[ERROR] Error al guardar el lote en el almacén: {e}")
+                cola.nack([i['Clave'] for i in issues], trabajador, error=str(e)[:200], reintentar_en=60)
+                continue
+            confirmados += cola.ack([i['Clave'] for i in issues], trabajador)
+            print(f"[OK] Lote de {len(claves)} claves: {len(issues)} confirmadas, {len(fallidas)} devueltas, "
+                  f"{len(liberadas)} liberadas (total confirmadas: {confirmados})")
+        
+        if presupuesto.agotado():
+            print("[!] Presupuesto de tiempo agotado")
+        print(f"\n[OK] Trabajador '{trabajador}' terminado - {confirmados} claves confirmadas - cola: {cola.resumen()}")
+    finally:
+        cola.cerrar()
+
 if __name__ == "__main__":
     # Procesar el XLSX
     # Por defecto sobrescribe el archivo original, pero puedes crear una copia primero
     import sys
-    
-    archivo_entrada = sys.argv[1] if len(sys.argv) > 1 else "Libro1.xlsx"
-    
-    if not os.path.exists(archivo_entrada):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Procesa el XLSX o CSV y llena las fechas de cambio de estado desde Jira')
+    parser.add_argument('archivo_entrada', nargs='?', default='Libro1.xlsx')
+    parser.add_argument('--formato', default=None,
+                        help="Formatos de salida separados por coma: xlsx, csv, parquet, arrow (por defecto el del archivo de entrada)")
+    parser.add_argument('--presupuesto', metavar='SEGUNDOS', type=float, default=None,
+                        help="Tiempo máximo para enriquecer; se procesa por prioridad y se escriben resultados parciales")
+    parser.add_argument('--sin-poda', action='store_true',
+                        help="No consultar por JQL qué issues pueden tener cada hito antes del PASO 1")
+    parser.add_argument('--trabajador', nargs='?', const='', default=None, metavar='ID',
+                        help="Modo trabajador: enriquecer claves de la cola durable (ver cola_trabajo.py) en lugar del archivo")
+    parser.add_argument('--lote', type=int, default=LOTE_COLA_DEFAULT, help="Claves por arriendo en modo trabajador")
+    parser.add_argument('--visibilidad', type=float, default=VISIBILIDAD_DEFAULT,
+                        help="Segundos del arriendo en modo trabajador")
+    parser.add_argument('--particiones', metavar='DIR', default=None,
+                        help="Procesar solo las particiones semanales abiertas del almacén y escribir un archivo por semana en DIR")
+    perfilado.agregar_argumentos(parser)
+    args = parser.parse_args()
+    perfilado.activar_desde_argumentos(args, JiraIntegration)
+    
+    archivo_entrada = args.archivo_entrada
+    formatos = [f.strip() for f in args.formato.split(',') if f.strip()] if args.formato else None
+    directorio_particiones = args.particiones or cargar_directorio_particiones()
+    
+    if args.trabajador is not None:
+        procesar_cola(args.trabajador or None, lote=args.lote, visibilidad=args.visibilidad,
+                      presupuesto_segundos=args.presupuesto, poda_jql=False if args.sin_poda else None)
+        perfilado.terminar_etapa()
+        sys.exit(0)
+    
+    if not os.path.exists(archivo_entrada) and not directorio_particiones:
         print(f"[ERROR] El archivo {archivo_entrada} no existe")
         sys.exit(1)
     
@@ -446,4 +872,5 @@ if __name__ == "__main__":
         shutil.copy2(archivo_entrada, backup)
         print(f"[*] Copia de respaldo creada: {backup}\n")
     
-    procesar_csv(archivo_entrada)
+    procesar_csv(archivo_entrada, formatos=formatos, directorio_particiones=directorio_particiones,
+                 presupuesto_segundos=args.presupuesto, poda_jql=False if args.sin_poda else None)
@@ -0,0 +1,103 @@
+"""
+Resumen SLA vectorizado sobre las filas enriquecidas
+Calcula media, mediana, p90 y p95 de I.First Response, I.Escalamiento e I.respuesta Sub
+(en horas de reloj y en horas hábiles) agrupando por día, semana ISO o persona asignada (First response).
+"""
+from datetime import date
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from almacen import COLUMNAS_DIFERENCIAS
+
+AGRUPACIONES_VALIDAS = ('dia', 'semana', 'asignado')
+ENCABEZADOS_RESUMEN = ['Agrupación', 'Grupo', 'Métrica', 'N', 'Media', 'Mediana', 'P90', 'P95']
+
+# Clave interna (no exportada) con la persona asignada en el hito First response
+COLUMNA_ASIGNADO = 'Asignado'
+
+
+def cargar_agrupaciones() -> List[str]:
+    """Agrupaciones del resumen desde config.py (SLA_AGRUPACIONES) o todas por defecto"""
+    agrupaciones = None
+    try:
+        import config
+        agrupaciones = getattr(config, 'SLA_AGRUPACIONES', None)
+    except ImportError:
+        pass
+    agrupaciones = list(agrupaciones or AGRUPACIONES_VALIDAS)
+    invalidas = [a for a in agrupaciones if a not in AGRUPACIONES_VALIDAS]
+    if invalidas:
+        raise ValueError(f"Agrupaciones no válidas: {invalidas} (usar {AGRUPACIONES_VALIDAS})")
+    return agrupaciones
+
+
+def _a_float(valor) -> float:
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _clave_grupo(issue_data: Dict, agrupacion: str, columna_fecha: str) -> str:
+    """Grupo de una fila: fecha del hito de referencia (día/semana) o persona asignada"""
+    if agrupacion == 'asignado':
+        return issue_data.get(COLUMNA_ASIGNADO) or '(sin asignar)'
+    # Fecha en el offset original de Jira (ej: 2026-01-14T05:56:15.665-0500 -> 2026-01-14)
+    fecha = str(issue_data.get(columna_fecha) or '')[:10]
+    try:
+        dia = date.fromisoformat(fecha)
+    except ValueError:
+        return '(sin fecha)'
+    if agrupacion == 'dia':
+        return dia.isoformat()
+    anio, semana, _ = dia.isocalendar()
+    return f"{anio}-W{semana:02d}"
+
+
+def calcular_resumen(issues: List[Dict], agrupaciones: Optional[List[str]] = None,
+                     columna_fecha: str = 'with RSOC') -> List[List]:
+    """
+    Calcula estadísticas por grupo para cada métrica de horas.
+
+    Args:
+        issues: Filas enriquecidas (después del PASO 2/3)
+        agrupaciones: Lista de 'dia', 'semana' y/o 'asignado'
+        columna_fecha: Hito usado como fecha de referencia para día/semana
+
+    Returns:
+        Filas con ENCABEZADOS_RESUMEN (incluye un grupo 'Total' por agrupación)
+    """
+    agrupaciones = agrupaciones or list(AGRUPACIONES_VALIDAS)
+    if not issues:
+        return []
+
+    # Matriz (filas x métricas) con NaN donde no hay valor
+    valores = np.array([[_a_float(i.get(col)) for col in COLUMNAS_DIFERENCIAS] for i in issues],
+                       dtype=np.float64)
+
+    resumen = []
+    for agrupacion in agrupaciones:
+        claves = np.array([_clave_grupo(i, agrupacion, columna_fecha) for i in issues], dtype=object)
+        grupos, inversa = np.unique(claves.astype(str), return_inverse=True)
+
+        # Ordenar filas por grupo una sola vez y cortar en segmentos contiguos
+        orden = np.argsort(inversa, kind='stable')
+        limites = np.searchsorted(inversa[orden], np.arange(len(grupos) + 1))
+        ordenados = valores[orden]
+
+        segmentos = [('Total', valores)]
+        segmentos += [(grupos[g], ordenados[limites[g]:limites[g + 1]]) for g in range(len(grupos))]
+
+        for nombre_grupo, bloque in segmentos:
+            conteos = np.count_nonzero(~np.isnan(bloque), axis=0)
+            for idx, metrica in enumerate(COLUMNAS_DIFERENCIAS):
+                if not conteos[idx]:
+                    continue
+                columna = bloque[:, idx]
+                columna = columna[~np.isnan(columna)]
+                mediana, p90, p95 = np.percentile(columna, [50, 90, 95])
+                resumen.append([agrupacion, str(nombre_grupo), metrica, int(conteos[idx]),
+                                round(float(columna.mean()), 2), round(float(mediana), 2),
+                                round(float(p90), 2), round(float(p95), 2)])
+    return resumen
@@ -0,0 +1,286 @@
+"""
+Receptor HTTP local para webhooks de Jira (jira:issue_updated)
+Extrae los cambios de status y assignee del changelog del evento y actualiza en el almacén
+solo los hitos y diferencias del issue afectado, sin re-escanear toda la ventana de 30 días.
+
+Uso:
+    python webhook_receiver.py --puerto 8080 [--guardar-payloads payloads/]
+    python webhook_receiver.py --replay payloads/*.json
+"""
+import os
+import json
+import hmac
+import hashlib
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List, Dict
+
+from almacen import AlmacenIssues, fecha_a_epoch
+from hitos import cargar_definiciones_hitos
+from procesar_csv import calcular_diferencias_horas
+from jira_integration import CatalogoChangelog
+from archivo_changelog import ArchivoChangelog, obtener_ruta_archivo
+from calendario_sla import CalendarioLaboral, calcular_diferencias_habiles
+
+EVENTOS_SOPORTADOS = ('jira:issue_updated',)
+
+# Serializa las escrituras al almacén entre hilos del servidor
+_lock_almacen = threading.Lock()
+
+
+def cargar_secreto_webhook() -> Optional[str]:
+    """Secreto para validar la firma X-Hub-Signature (config.py WEBHOOK_SECRET o variable de entorno)"""
+    secreto = None
+    try:
+        import config
+        secreto = getattr(config, 'WEBHOOK_SECRET', None)
+    except ImportError:
+        pass
+    return secreto or os.getenv('WEBHOOK_SECRET') or None
+
+
+def firma_valida(cuerpo: bytes, firma: Optional[str], secreto: Optional[str]) -> bool:
+    """Valida la firma HMAC-SHA256 del cuerpo ('sha256=<hex>'). Sin secreto configurado no se valida."""
+    if not secreto:
+        return True
+    if not firma or not firma.startswith('sha256='):
+        return False
+    esperada = hmac.new(secreto.encode('utf-8'), cuerpo, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(esperada, firma[len('sha256='):])
+
+
+def cargar_catalogo() -> CatalogoChangelog:
+    """
+    Catálogo para evaluar los eventos igual que JiraIntegration: usa el catálogo de estados
+    guardado junto al archivo de changelogs (sin él, los nombres del propio evento)
+    """
+    estados = {}
+    ruta_archivo = obtener_ruta_archivo()
+    if ruta_archivo:
+        try:
+            with ArchivoChangelog(ruta_archivo) as archivo:
+                estados = archivo.leer_estados()
+        except Exception as e:
+            print(f"[!] No se pudo leer el catálogo de estados: {e}")
+    if not estados:
+        print("[!] Sin catálogo de estados guardado: los estados se comparan por el nombre del evento")
+    return CatalogoChangelog(estados)
+
+
+def _fecha_evento(payload: Dict) -> str:
+    """Fecha del cambio en formato Jira: fields.updated del issue o, si no existe, el timestamp del evento"""
+    fields = (payload.get('issue') or {}).get('fields') or {}
+    if fields.get('updated'):
+        return fields['updated']
+    timestamp_ms = payload.get('timestamp')
+    dt = datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc) if timestamp_ms else datetime.now(timezone.utc)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}+0000"
+
+
+def extraer_cambios(payload: Dict) -> List[Dict]:
+    """
+    Convierte el changelog del evento al mismo formato que JiraIntegration.get_changelog.
+
+    Returns:
+        Lista de cambios (vacía si el evento no trae changelog)
+    """
+    issue_key = (payload.get('issue') or {}).get('key', '')
+    usuario = payload.get('user') or {}
+    autor = usuario.get('displayName', '')
+    autor_id = usuario.get('accountId') or usuario.get('name')
+    fecha = _fecha_evento(payload)
+    cambios = []
+    for item in (payload.get('changelog') or {}).get('items', []):
+        cambios.append({
+            'issue_key': issue_key,
+            'date': fecha,
+            'author': autor,
+            'author_id': autor_id or autor,
+            'field': item.get('field', ''),
+            'from': item.get('fromString', ''),
+            'to': item.get('toString', ''),
+            'from_id': item.get('from', None),
+            'to_id': item.get('to', None)
+        })
+    return cambios
+
+
+def procesar_evento(payload: Dict, definiciones: List[Dict], almacen: AlmacenIssues,
+                    calendario: Optional[CalendarioLaboral] = None,
+                    catalogo: Optional[CatalogoChangelog] = None) -> Optional[Dict]:
+    """
+    Aplica un evento de webhook al almacén.
+    Los hitos se evalúan con la misma ruta que JiraIntegration (eventos compactos y coincidencia
+    por IDs, ver CatalogoChangelog).
+    Para ocurrencia 'primera' solo se reemplaza un hito si el nuevo cambio es anterior al guardado;
+    para 'ultima', si es posterior.
+
+    Returns:
+        La fila actualizada del issue, o None si el evento se ignoró
+    """
+    if payload.get('webhookEvent') not in EVENTOS_SOPORTADOS:
+        return None
+    issue = payload.get('issue') or {}
+    issue_key = issue.get('key')
+    if not issue_key:
+        return None
+
+    fields = issue.get('fields') or {}
+    almacen.upsert_issues([{
+        'Clave': issue_key,
+        'creado': fields.get('created'),
+        'actualizado': fields.get('updated'),
+        'estado': (fields.get('status') or {}).get('name')
+    }])
+
+    catalogo = catalogo or CatalogoChangelog()
+    encontrados = catalogo.hitos_de_eventos(issue_key, catalogo.compactar(extraer_cambios(payload)), definiciones)
+
+    columnas_hitos = [d['columna'] for d in definiciones]
+    fila = almacen.obtener_filas([issue_key], columnas_hitos=columnas_hitos)[0]
+    actualizados = []
+    for definicion in definiciones:
+        columna = definicion['columna']
+        change = encontrados.get(columna)
+        if not change:
+            continue
+        epoch_nuevo = fecha_a_epoch(change['date'])
+        epoch_actual = fecha_a_epoch(fila.get(columna))
+        if epoch_actual is None or epoch_nuevo is None:
+            reemplazar = epoch_nuevo is not None or epoch_actual is None
+        elif definicion['ocurrencia'] == 'primera':
+            reemplazar = epoch_nuevo < epoch_actual
+        else:
+            reemplazar = epoch_nuevo > epoch_actual
+        if reemplazar:
+            fila[columna] = change['date']
+            actualizados.append(columna)
+
+    if actualizados:
+        calcular_diferencias_horas(fila)
+        calcular_diferencias_habiles([fila], calendario)
+        almacen.guardar_filas([fila], columnas_hitos=columnas_hitos)
+        print(f"[OK] {issue_key}: actualizado {', '.join(actualizados)}")
+    return fila
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Handler HTTP: POST /webhook con el payload JSON de Jira"""
+    definiciones: List[Dict] = []
+    calendario: Optional[CalendarioLaboral] = None
+    catalogo: Optional[CatalogoChangelog] = None
+    secreto: Optional[str] = None
+    directorio_payloads: Optional[str] = None
+
+    def do_POST(self):
+        if self.path.split('?')[0].rstrip('/') != '/webhook':
+            self.send_error(404)
+            return
+        longitud = int(self.headers.get('Content-Length', 0))
+        cuerpo = self.rfile.read(longitud)
+        if not firma_valida(cuerpo, self.headers.get('X-Hub-Signature'), self.secreto):
+            self.send_error(401, 'Firma inválida')
+            return
+        try:
+            payload = json.loads(cuerpo)
+        except ValueError:
+            self.send_error(400, 'JSON inválido')
+            return
+
+        if self.directorio_payloads:
+            guardar_payload(payload, self.directorio_payloads)
+
+        try:
+            with _lock_almacen, AlmacenIssues() as almacen:
+                procesar_evento(payload, self.definiciones, almacen, self.calendario, self.catalogo)
+        except Exception as e:
+            print(f"[ERROR] Error al procesar webhook: {e}")
+            self.send_error(500)
+            return
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        # Silenciar el log por petición de BaseHTTPRequestHandler
+        pass
+
+
+def guardar_payload(payload: Dict, directorio: str):
+    """Guarda el payload recibido para reproducirlo luego con --replay"""
+    os.makedirs(directorio, exist_ok=True)
+    issue_key = (payload.get('issue') or {}).get('key', 'sin-clave')
+    nombre = f"{payload.get('timestamp') or int(datetime.now().timestamp() * 1000)}_{issue_key}.json"
+    with open(os.path.join(directorio, nombre), 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+
+
+def reproducir_payloads(archivos: List[str], definiciones: List[Dict],
+                        calendario: Optional[CalendarioLaboral] = None,
+                        catalogo: Optional[CatalogoChangelog] = None) -> int:
+    """
+    Reproduce payloads grabados (un JSON por archivo o JSON Lines) en orden de timestamp.
+
+    Returns:
+        Número de eventos aplicados
+    """
+    payloads = []
+    for archivo in archivos:
+        with open(archivo, 'r', encoding='utf-8') as f:
+            contenido = f.read().strip()
+        if not contenido:
+            continue
+        try:
+            payloads.append(json.loads(contenido))
+        except ValueError:
+            payloads.extend(json.loads(linea) for linea in contenido.splitlines() if linea.strip())
+    payloads.sort(key=lambda p: p.get('timestamp') or 0)
+
+    aplicados = 0
+    catalogo = catalogo or cargar_catalogo()
+    with AlmacenIssues() as almacen:
+        for payload in payloads:
+            if procesar_evento(payload, definiciones, almacen, calendario, catalogo) is not None:
+                aplicados += 1
+    return aplicados
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Receptor de webhooks jira:issue_updated')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8080)
+    parser.add_argument('--guardar-payloads', metavar='DIR', help='Guardar cada payload recibido en DIR')
+    parser.add_argument('--replay', nargs='+', metavar='ARCHIVO', help='Reproducir payloads grabados y salir')
+    args = parser.parse_args()
+
+    definiciones = cargar_definiciones_hitos()
+    calendario = CalendarioLaboral()
+    catalogo = cargar_catalogo()
+
+    if args.replay:
+        aplicados = reproducir_payloads(args.replay, definiciones, calendario, catalogo)
+        print(f"[OK] {aplicados} eventos reproducidos")
+        return
+
+    WebhookHandler.definiciones = definiciones
+    WebhookHandler.calendario = calendario
+    WebhookHandler.catalogo = catalogo
+    WebhookHandler.secreto = cargar_secreto_webhook()
+    WebhookHandler.directorio_payloads = args.guardar_payloads
+
+    servidor = ThreadingHTTPServer((args.host, args.puerto), WebhookHandler)
+    print(f"[*] Escuchando webhooks en http://{args.host}:{args.puerto}/webhook")
+    if not WebhookHandler.secreto:
+        print("[!] Advertencia: WEBHOOK_SECRET no configurado, no se validan firmas")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[*] Deteniendo receptor...")
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()